@@ -1,28 +1,19 @@
 """Debug - show raw text for table parsing."""
 import imaplib
 import email
-from email.header import decode_header
 import sys
 sys.path.insert(0, 'src')
 
+from config import load_config
 from parsers import parse_html
 
-HOST = "imap.gmail.com"
-USER = "lovelykimura832@gmail.com"
-PASSWORD = "ztrv pndd qslg jtsh"
+# Credentials come from .env (EMAIL_HOST, EMAIL_USER, EMAIL_PASSWORD)
+config = load_config()
+HOST = config.email_host
+USER = config.email_user
+PASSWORD = config.email_password
 FROM_FILTERS = ["s1963@yandex.ru", "nsv11061992@gmail.com"]
 
-def decode_header_str(header):
-    if not header:
-        return ""
-    decoded = []
-    for part, enc in decode_header(header):
-        if isinstance(part, bytes):
-            decoded.append(part.decode(enc or "utf-8", errors="replace"))
-        else:
-            decoded.append(part)
-    return " ".join(decoded)
-
 mail = imaplib.IMAP4_SSL(HOST)
 mail.login(USER, PASSWORD)
 mail.select("INBOX")
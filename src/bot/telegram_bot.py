@@ -26,8 +26,8 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import load_config
-from database.sheets import get_client, get_sheet, add_order, update_order_row, OrderRow, get_orders_by_date, update_contact_status
-from extractors.phone import extract_phone
+from database.sheets import get_client, get_sheet, add_order, add_orders, update_order_row, OrderRow, get_orders_by_date, update_contact_status
+from extractors.phone import digits_only, extract_phone
 from extractors.apteka_parser import extract_product_from_url, extract_product_with_price
 from email_monitor import EmailMonitor, monitor_loop
 
@@ -491,14 +491,14 @@ async def api_handle_order(request):
         # Smart fallback: If phone contains letters and looks like a comment, move it to comment
         # (User writes "Oleg" in phone field)
         import re
-        if re.search(r'[a-zA-Zа-яА-ЯёЁ]', phone) and len(re.sub(r'\D', '', phone)) < 5:
+        if re.search(r'[a-zA-Zа-яА-ЯёЁ]', phone) and len(digits_only(phone)) < 5:
             if not comment:
                 comment = phone
                 phone = ""
         
         # Normalize phone number to 7XXXXXXXXXX format
         if phone:
-            phone = ''.join(c for c in phone if c.isdigit())  # Keep only digits
+            phone = digits_only(phone)  # Keep only digits
             if len(phone) == 10 and phone.startswith('9'):
                 phone = '7' + phone  # 9181234567 -> 79181234567
             elif len(phone) == 11 and phone.startswith('8'):
@@ -638,7 +638,7 @@ async def send_daily_reminder(bot, sheet, admin_id: int):
 def get_contact_keyboard(row_number: int, phone: str = ""):
     """Get keyboard with direct messenger links + status buttons."""
     # Clean phone for URLs
-    phone_digits = ''.join(c for c in phone if c.isdigit())
+    phone_digits = digits_only(phone)
     
     if phone_digits:
         keyboard = [
@@ -769,7 +769,7 @@ async def handle_contact_callback(update: Update, context: ContextTypes.DEFAULT_
     for line in lines:
         if "📞" in line or "☎️" in line:
             # Extract only digits
-            phone = "".join(c for c in line if c.isdigit())
+            phone = digits_only(line)
             break
     
     # Clean phone for links (digits only, ensuring it's the full number)
@@ -901,6 +901,9 @@ def main():
         scheduler.start()
         logger.info("⏰ Планировщик запущен: напоминание в 12:00 ежедневно")
         
+        # Orders from one email check, written to the sheet in one request
+        pending_email_rows: list[OrderRow] = []
+        
         # Email monitor callback
         async def on_email_order(order_data):
             """Process order from email."""
@@ -927,8 +930,8 @@ def main():
                 total=order_data.total,
                 note="📧 Email",
             )
-            row_num = add_order(sheet, order_row)
-            logger.info(f"📧 Заказ из email добавлен: {order_data.phone}, товаров: {len(order_data.products)}")
+            pending_email_rows.append(order_row)
+            logger.info(f"📧 Заказ из email в очереди: {order_data.phone}, товаров: {len(order_data.products)}")
             
             # Build notification message
             phone_display = f"+{order_data.phone.lstrip('+')}"
@@ -959,6 +962,15 @@ def main():
                 )
             except Exception as e:
                 logger.error(f"❌ Ошибка уведомления: {e}")
+        
+        async def flush_email_orders():
+            """Append orders queued during the last email check in one request."""
+            if not pending_email_rows:
+                return
+            rows = pending_email_rows[:]
+            pending_email_rows.clear()
+            first_row = await asyncio.to_thread(add_orders, sheet, rows)
+            logger.info(f"📧 Заказы из email добавлены: {len(rows)} (со строки {first_row})")
 
         
         # Start email monitor if configured
@@ -970,7 +982,10 @@ def main():
                 folder=config.email_folder,
                 from_filter=config.email_from_filter,
             )
-            asyncio.create_task(monitor_loop(email_monitor, on_email_order, check_interval=120))
+            asyncio.create_task(monitor_loop(
+                email_monitor, on_email_order, check_interval=120,
+                on_batch_end=flush_email_orders,
+            ))
             logger.info("📧 Email-мониторинг запущен (проверка каждые 2 мин)")
         else:
             logger.info("📧 Email-мониторинг отключен (нет настроек в .env)")
@@ -2,9 +2,11 @@
 
 from datetime import datetime
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 import os
 import json
+import re
 
 import gspread
 from google.oauth2.service_account import Credentials
@@ -28,7 +30,7 @@ HEADERS = [
 ]
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderRow:
     """Order data for spreadsheet."""
     date: str
@@ -44,14 +46,24 @@ class OrderRow:
 
 
 def get_client(credentials_path: str | Path) -> gspread.Client:
-    """Get authenticated gspread client."""
+    """
+    Get authenticated gspread client.
+    
+    The client is created once per credentials source and reused, so
+    repeated calls skip reading the key and re-authorizing.
+    """
+    return _authorize(str(credentials_path), os.environ.get("GOOGLE_CREDENTIALS_JSON"))
+
+
+@lru_cache(maxsize=4)
+def _authorize(credentials_path: str, json_creds: str | None) -> gspread.Client:
+    """Build an authorized client (cached by get_client)."""
     scopes = [
         "https://www.googleapis.com/auth/spreadsheets",
         "https://www.googleapis.com/auth/drive",
     ]
     
     # Try to load from env var first (for Cloud hosting)
-    json_creds = os.environ.get("GOOGLE_CREDENTIALS_JSON")
     if json_creds:
         try:
             creds_dict = json.loads(json_creds)
@@ -65,15 +77,16 @@ def get_client(credentials_path: str | Path) -> gspread.Client:
 
     # Fallback to file on disk
     creds = Credentials.from_service_account_file(
-        str(credentials_path),
+        credentials_path,
         scopes=scopes,
     )
     
     return gspread.authorize(creds)
 
 
+@lru_cache(maxsize=4)
 def get_sheet(client: gspread.Client) -> gspread.Worksheet:
-    """Get the main worksheet."""
+    """Get the main worksheet (opened and header-checked once per client)."""
     spreadsheet = client.open_by_key(SPREADSHEET_ID)
     
     # Get first sheet or create "Заказы"
@@ -91,17 +104,9 @@ def get_sheet(client: gspread.Client) -> gspread.Worksheet:
     return sheet
 
 
-def add_order(
-    sheet: gspread.Worksheet,
-    order: OrderRow,
-) -> int:
-    """
-    Add order to spreadsheet.
-    
-    Returns:
-        Row number of added order
-    """
-    row_data = [
+def _order_to_row(order: OrderRow) -> list[str]:
+    """Convert order to spreadsheet row values (columns A-J)."""
+    return [
         order.date,
         order.order_number,
         order.phone,
@@ -113,8 +118,19 @@ def add_order(
         order.note,
         order.contact_status,
     ]
+
+
+def add_order(
+    sheet: gspread.Worksheet,
+    order: OrderRow,
+) -> int:
+    """
+    Add order to spreadsheet.
     
-    sheet.append_row(row_data)
+    Returns:
+        Row number of added order
+    """
+    sheet.append_row(_order_to_row(order))
     # Get the row index of the newly added row
     # (Using sheet.row_count after append is risky if multiple people use it,
     # but append_row doesn't return the row index directly in gspread 3.x)
@@ -122,28 +138,35 @@ def add_order(
     return len(sheet.get_all_values())
 
 
+def add_orders(
+    sheet: gspread.Worksheet,
+    orders: list[OrderRow],
+) -> int | None:
+    """
+    Add several orders with a single append request.
+    
+    Returns:
+        Row number of the first added order, or None if nothing was added
+    """
+    if not orders:
+        return None
+    
+    response = sheet.append_rows([_order_to_row(order) for order in orders])
+    # updatedRange looks like "'Заказы'!A5:J7"
+    updated_range = response.get("updates", {}).get("updatedRange", "")
+    match = re.search(r"![A-Z]+(\d+)", updated_range)
+    return int(match.group(1)) if match else None
+
+
 def update_order_row(
     sheet: gspread.Worksheet,
     row: int,
     order: OrderRow,
 ) -> None:
     """Replace all data in a specific row."""
-    row_data = [
-        order.date,
-        order.order_number,
-        order.phone,
-        order.products,
-        str(order.total),
-        order.wa_status,
-        order.sms_status,
-        order.sent,
-        order.note,
-        order.contact_status,
-    ]
-    
     # Range from A to J for the given row
     cell_range = f"A{row}:J{row}"
-    sheet.update(cell_range, [row_data])
+    sheet.update(cell_range, [_order_to_row(order)])
 
 
 def delete_order_row(sheet: gspread.Worksheet, row: int) -> None:
@@ -163,6 +186,11 @@ def find_order_by_number(
         return None
 
 
+def get_order_numbers(sheet: gspread.Worksheet) -> set[str]:
+    """Get all order numbers in the sheet (column B) with a single read."""
+    return set(sheet.col_values(2)[1:])  # Skip header
+
+
 def update_order_status(
     sheet: gspread.Worksheet,
     row: int,
@@ -0,0 +1,78 @@
+"""Shared IMAP sessions: one login per (host, user) reused across checks."""
+
+import imaplib
+import threading
+import time
+
+# Idle time after which a session is checked with NOOP before reuse
+NOOP_AFTER = 60
+
+# (host, user) -> [connection, selected folder, last use (monotonic)]
+_sessions: dict[tuple[str, str], list] = {}
+_lock = threading.Lock()
+
+
+def get_imap(
+    host: str,
+    user: str,
+    password: str,
+    folder: str = "INBOX",
+    timeout: int = 20,
+) -> imaplib.IMAP4_SSL:
+    """
+    Get a logged-in IMAP connection with the folder selected.
+
+    The first call connects and logs in; later calls reuse the session.
+    A session idle for more than NOOP_AFTER seconds is probed with NOOP
+    and replaced if the server dropped it. imaplib is not thread-safe:
+    use the returned connection from one thread at a time.
+
+    Args:
+        host: IMAP server
+        user: Login
+        password: Password (app password for Gmail)
+        folder: Mailbox to select
+        timeout: Socket timeout in seconds
+
+    Returns:
+        imaplib.IMAP4_SSL connection
+    """
+    key = (host, user)
+    with _lock:
+        session = _sessions.get(key)
+        now = time.monotonic()
+
+        if session is not None and now - session[2] > NOOP_AFTER:
+            try:
+                session[0].noop()
+            except (imaplib.IMAP4.error, OSError):
+                # Stale connection (abort is a subclass of IMAP4.error)
+                _sessions.pop(key, None)
+                session = None
+
+        if session is None:
+            connection = imaplib.IMAP4_SSL(host, timeout=timeout)
+            connection.login(user, password)
+            session = [connection, None, now]
+            _sessions[key] = session
+
+        if session[1] != folder:
+            session[0].select(folder)
+            session[1] = folder
+
+        session[2] = now
+        return session[0]
+
+
+def close_imap(host: str, user: str) -> None:
+    """Log out and forget the session for (host, user), if any."""
+    with _lock:
+        session = _sessions.pop((host, user), None)
+    if session is None:
+        return
+    try:
+        if session[1] is not None:
+            session[0].close()
+        session[0].logout()
+    except Exception:
+        pass
@@ -4,21 +4,65 @@ import asyncio
 import email
 import imaplib
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, date
+from datetime import date, timedelta
 from email.header import decode_header
 from email.message import Message
 from pathlib import Path
-from typing import AsyncIterator
+from typing import Iterator
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+from email_client import close_imap, get_imap
 from parsers import parse_html, parse_pdf_bytes, parse_docx_bytes
 from extractors import extract_phone, extract_order_number
 import re
 from bs4 import BeautifulSoup
 
+# Katren phone anchor: cheap str.find locates candidates, regex runs on a window
+_PHONE_ANCHORS = ('Телефон', 'ТЕЛЕФОН', 'телефон')
+_PHONE_WINDOW = 200
+_KATREN_PHONE_RE = re.compile(r'Телефон\s*клиента[:\s]*\+?([78]?\d{10})', re.IGNORECASE)
+
+# Customer total keywords in priority order: the number must follow the keyword
+# directly (a header cell "Сумма для клиента" must not pick up product-row numbers)
+_CLIENT_TOTAL_KEYWORDS = (
+    'Сумма для клиента', 'СУММА ДЛЯ КЛИЕНТА',  # Direct match
+    'Цена для клиента', 'ЦЕНА ДЛЯ КЛИЕНТА',  # Alternative
+)
+_TOTAL_WINDOW = 80
+_NUMBER_RE = re.compile(r'(\d+(?:[,.]\d+)?)')
+_CLIENT_TOTAL_RE = re.compile(r'[:\s]*(\d+(?:[,.]\d+)?)')  # Anchored at the keyword end
+_ITOGO_ANCHORS = ('ИТОГО', 'Итого', 'итого')
+_ITOGO_RE = re.compile(r'(?:ИТОГО|Итого|итого)[:\s]*(.+)')  # Same variants as anchors
+
+# Header/summary markers (matched as substrings of the upper-cased cell/line)
+_TABLE_SKIP_WORDS = ('ТОВАР', 'ИТОГО', 'НАИМЕНОВАНИЕ', 'НАЗВАНИЕ', 'СУММА', 'ПРОИЗВОДИТЕЛЬ', 'КОЛ-ВО', 'ЦЕНА')
+_TEXT_SKIP_WORDS = ('ИТОГО', 'ПРОИЗВОДИТЕЛЬ', 'КОЛ-ВО', 'ЦЕНА', 'СУММА', 'ТОВАР', 'КЛИЕНТ', 'ТЕЛЕФОН', 'ЗАКАЗ', 'АДРЕС', 'АПТЕК', 'ЗДРАВСТВУЙТЕ', 'УВАЖЕНИЕМ', 'ПУЛЬС', 'КАТРЕН')
+
+
+# Shared pool for PDF/DOCX attachment parsing
+_ATTACHMENT_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="attachment")
+
+# Messages per IMAP FETCH: bounds memory while keeping round-trips low
+_FETCH_BATCH = 10
+
+# Incremental polling: highest handled UID per (host, user, folder, sender),
+# kept for the process lifetime so a new EmailMonitor per check reuses it.
+# Values are (UIDVALIDITY, last UID); a new UIDVALIDITY invalidates them.
+_last_uids: dict[tuple[str, str, str, str], tuple[int, int]] = {}
+# Last UIDVALIDITY seen per (host, user, folder)
+_uid_validity: dict[tuple[str, str, str], int] = {}
+_FETCH_UID_RE = re.compile(rb'UID (\d+)')
+
+
+def _find_first(text: str, anchors: tuple[str, ...]) -> int:
+    """Return the lowest index of any anchor in text, or -1."""
+    found = [i for i in (text.find(a) for a in anchors) if i >= 0]
+    return min(found) if found else -1
+
 
 @dataclass
 class EmailContent:
@@ -64,7 +108,8 @@ def extract_text_from_email(msg: Message) -> tuple[str, str, str]:
     """
     plain_text = ""
     html_text = ""
-    attachments_text = ""
+    # (filename header, parsed text or pending parse) in MIME order
+    attachment_parts: list[tuple[str, str | Future[str]]] = []
     
     if msg.is_multipart():
         for part in msg.walk():
@@ -88,15 +133,13 @@ def extract_text_from_email(msg: Message) -> tuple[str, str, str]:
                     filename = part.get_filename() or ""
                     filename_lower = filename.lower()
                     
+                    # PDF/DOCX parse in the pool while the walk continues
                     if filename_lower.endswith(".pdf"):
-                        attachments_text += f"\n--- {filename} ---\n"
-                        attachments_text += parse_pdf_bytes(payload)
+                        attachment_parts.append((filename, _ATTACHMENT_POOL.submit(parse_pdf_bytes, payload)))
                     elif filename_lower.endswith(".docx"):
-                        attachments_text += f"\n--- {filename} ---\n"
-                        attachments_text += parse_docx_bytes(payload)
+                        attachment_parts.append((filename, _ATTACHMENT_POOL.submit(parse_docx_bytes, payload)))
                     elif filename_lower.endswith((".txt", ".csv")):
-                        attachments_text += f"\n--- {filename} ---\n"
-                        attachments_text += payload.decode(charset, errors="replace")
+                        attachment_parts.append((filename, payload.decode(charset, errors="replace")))
                 
                 # Handle inline content
                 elif content_type == "text/plain":
@@ -120,6 +163,15 @@ def extract_text_from_email(msg: Message) -> tuple[str, str, str]:
             else:
                 plain_text = text
     
+    attachments_text = ""
+    for filename, content in attachment_parts:
+        if isinstance(content, Future):
+            try:
+                content = content.result()
+            except Exception:
+                continue
+        attachments_text += f"\n--- {filename} ---\n" + content
+    
     return plain_text, html_text, attachments_text
 
 
@@ -135,19 +187,28 @@ def parse_katren_email(html_content: str) -> tuple[str | None, list[str], float]
     
     phone = None
     products = []
+    seen: set[str] = set()
     total = 0.0
     
+    # Cheap pre-check: raw_body is converted text, so skip BeautifulSoup only
+    # when there is neither a phone label (any casing) nor a "cell| cell" row
+    if _find_first(html_content, _PHONE_ANCHORS) < 0 and '|' not in html_content:
+        return phone, products, total
+    
     try:
         soup = BeautifulSoup(html_content, 'html.parser')
         text = soup.get_text()
         
         # Extract phone - look for "Телефон клиента:" pattern with mobile number
         # Mobile numbers start with +7 or 8, followed by 9xx (mobile prefix)
-        phone_match = re.search(
-            r'Телефон\s*клиента[:\s]*\+?([78]?\d{10})', 
-            text, 
-            re.IGNORECASE
-        )
+        phone_match = None
+        for anchor in _PHONE_ANCHORS:
+            idx = text.find(anchor)
+            while idx >= 0 and not phone_match:
+                phone_match = _KATREN_PHONE_RE.match(text, idx, idx + _PHONE_WINDOW)
+                idx = text.find(anchor, idx + 1)
+            if phone_match:
+                break
         if phone_match:
             phone = phone_match.group(1)
             # Normalize to 7XXXXXXXXXX format
@@ -168,8 +229,8 @@ def parse_katren_email(html_content: str) -> tuple[str | None, list[str], float]
                 if len(cells) >= 2:
                     first_cell_text = cells[0].get_text(strip=True)
                     # Skip headers and summary rows
-                    skip_words = ['ТОВАР', 'ИТОГО', 'ИТОГО:', 'НАИМЕНОВАНИЕ', 'НАЗВАНИЕ', 'СУММА', 'ПРОИЗВОДИТЕЛЬ', 'КОЛ-ВО', 'ЦЕНА']
-                    if any(w in first_cell_text.upper() for w in skip_words):
+                    upper_text = first_cell_text.upper()
+                    if any(w in upper_text for w in _TABLE_SKIP_WORDS):
                         continue
                     # Skip empty or very short cells
                     if len(first_cell_text) < 5:
@@ -189,9 +250,10 @@ def parse_katren_email(html_content: str) -> tuple[str | None, list[str], float]
                     ))
                     
                     if (is_brand or is_cyrillic) and has_measure:
-                        # Clean up product name - keep it readable
-                        product_name = first_cell_text.strip()[:100]
-                        if product_name and product_name not in products:
+                        # Clean up product name - keep it readable (cell text is already stripped)
+                        product_name = first_cell_text[:100]
+                        if product_name and product_name not in seen:
+                            seen.add(product_name)
                             products.append(product_name)
                             logger.info(f"📧 Found product: {product_name[:50]}...")
         
@@ -205,15 +267,16 @@ def parse_katren_email(html_content: str) -> tuple[str | None, list[str], float]
                 # Skip short lines, headers, and known non-product patterns
                 if len(line) < 10 or len(line) > 150:
                     continue
-                skip_words = ['ИТОГО', 'ПРОИЗВОДИТЕЛЬ', 'КОЛ-ВО', 'ЦЕНА', 'СУММА', 'ТОВАР', 'КЛИЕНТ', 'ТЕЛЕФОН', 'ЗАКАЗ', 'АДРЕС', 'АПТЕК', 'ЗДРАВСТВУЙТЕ', 'УВАЖЕНИЕМ', 'ПУЛЬС', 'КАТРЕН']
-                if any(w in line.upper() for w in skip_words):
+                upper_line = line.upper()
+                if any(w in upper_line for w in _TEXT_SKIP_WORDS):
                     continue
                 # Product patterns: Cyrillic text + dosage forms OR measurements
                 # Match: "Бетаметазон-ВЕРТЕКС крем д/наруж прим 0,05 % туба 30 г"
                 if re.search(r'[А-Яа-яЁё]{4,}.*(крем|мазь|гель|табл|капс|сироп|капли|раствор|спрей|порошок|суппозит|свечи|ампул|\d+\s*(мл|мг|г|шт))', line, re.IGNORECASE):
                     # Clean up the product name - take only the first part before numbers/manufacturer
-                    product_name = line.strip()[:100]
-                    if product_name and product_name not in products:
+                    product_name = line[:100]
+                    if product_name and product_name not in seen:
+                        seen.add(product_name)
                         products.append(product_name)
                         logger.info(f"📧 Found product from text: {product_name[:50]}...")
                         if len(products) >= 10:
@@ -221,17 +284,16 @@ def parse_katren_email(html_content: str) -> tuple[str | None, list[str], float]
         
         # Extract total - prioritize "Сумма для клиента" (customer price, not pharmacy price)
         # In Katren emails, the last number in ИТОГО row is the customer price
-        total_patterns = [
-            r'Сумма для клиента[:\s]*(\d+(?:[,.]\d+)?)',  # Direct match
-            r'Цена для клиента[:\s]*(\d+(?:[,.]\d+)?)',  # Alternative
-        ]
-        
-        for pattern in total_patterns:
-            total_match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        for keyword in _CLIENT_TOTAL_KEYWORDS:
+            total_match = None
+            i = text.find(keyword)
+            while i >= 0 and not total_match:
+                start = i + len(keyword)
+                total_match = _CLIENT_TOTAL_RE.match(text, start, start + _TOTAL_WINDOW)
+                i = text.find(keyword, start)
             if total_match:
-                total_str = total_match.group(1).replace(',', '.').replace(' ', '')
                 try:
-                    total = float(total_str)
+                    total = float(total_match.group(1).replace(',', '.'))
                     if total > 0:
                         logger.info(f"📧 Found total (customer): {total}")
                         break
@@ -239,12 +301,13 @@ def parse_katren_email(html_content: str) -> tuple[str | None, list[str], float]
                     pass
         
         # Fallback: find ИТОГО line and take the LAST number (customer price is rightmost column)
-        if total == 0:
-            itogo_match = re.search(r'ИТОГО[:\s]*(.+)', text, re.IGNORECASE)
+        itogo_pos = _find_first(text, _ITOGO_ANCHORS) if total == 0 else -1
+        if itogo_pos >= 0:
+            itogo_match = _ITOGO_RE.match(text, itogo_pos)
             if itogo_match:
                 itogo_line = itogo_match.group(1)
                 # Find all numbers in the ИТОГО line, take the last one
-                numbers = re.findall(r'(\d+(?:[,.]\d+)?)', itogo_line)
+                numbers = _NUMBER_RE.findall(itogo_line)
                 if numbers:
                     last_number = numbers[-1].replace(',', '.')
                     try:
@@ -285,19 +348,16 @@ class EmailMonitor:
         self._connection: imaplib.IMAP4_SSL | None = None
     
     def connect(self) -> None:
-        """Establish IMAP connection."""
-        self._connection = imaplib.IMAP4_SSL(self.host, timeout=self.timeout)
-        self._connection.login(self.user, self.password)
-        self._connection.select(self.folder)
+        """Get IMAP connection (shared session, re-login only if stale)."""
+        self._connection = get_imap(
+            self.host, self.user, self.password,
+            folder=self.folder, timeout=self.timeout,
+        )
     
     def disconnect(self) -> None:
         """Close IMAP connection."""
         if self._connection:
-            try:
-                self._connection.close()
-                self._connection.logout()
-            except Exception:
-                pass
+            close_imap(self.host, self.user)
             self._connection = None
     
     def fetch_unread_emails(self) -> list[EmailContent]:
@@ -307,57 +367,119 @@ class EmailMonitor:
         Returns:
             List of EmailContent objects
         """
+        return list(self.fetch_unread_iter())
+    
+    def fetch_unread_iter(self) -> Iterator[EmailContent]:
+        """
+        Yield unread emails from configured sender(s) one at a time.
+        
+        Messages are fetched in small batches, so only one batch of raw
+        emails (with attachments) is held in memory at once.
+        
+        Yields:
+            EmailContent objects
+        """
         import logging
         logger = logging.getLogger(__name__)
         
-        # Always reconnect to avoid stale connections
-        self.disconnect()
+        # Reuse the session; get_imap checks it with NOOP and reconnects if stale
         self.connect()
         logger.info("📧 Connected to IMAP server")
         
         assert self._connection is not None
         
-        emails: list[EmailContent] = []
+        # SELECT leaves an untagged UIDVALIDITY; it is only there after a
+        # (re)select, otherwise the last recorded value still applies
+        folder_key = (self.host, self.user, self.folder)
+        _, validity = self._connection.response("UIDVALIDITY")
+        if validity[-1] is not None:
+            _uid_validity[folder_key] = int(validity[-1])
         
         # Support multiple senders (comma-separated) or empty filter
         senders = [s.strip() for s in self.from_filter.split(",") if s.strip()]
         
         # Use yesterday's date to catch overnight emails (Render may restart)
         # SINCE filter uses DD-MMM-YYYY format (e.g., 26-Jan-2026)
-        from datetime import timedelta
         yesterday = date.today() - timedelta(days=1)
         since_str = yesterday.strftime("%d-%b-%Y")
         logger.info(f"📧 Searching emails since {since_str}")
         
         if not senders:
             # If no senders specified, fetch all unread emails
-            search_criteria = f'(UNSEEN SINCE {since_str})'
-            emails.extend(self._search_and_fetch(search_criteria))
+            search_criteria = f'UNSEEN SINCE {since_str}'
+            yield from self._search_and_fetch(search_criteria, "")
         else:
             # Search for each filter
             for filter_sender in senders:
-                search_criteria = f'(UNSEEN SINCE {since_str} FROM "{filter_sender}")'
-                emails.extend(self._search_and_fetch(search_criteria))
-        
-        return emails
+                search_criteria = f'UNSEEN SINCE {since_str} FROM "{filter_sender}"'
+                yield from self._search_and_fetch(search_criteria, filter_sender)
 
-    def _search_and_fetch(self, search_criteria: str) -> list[EmailContent]:
-        """Helper to search and fetch emails by criteria."""
-        emails: list[EmailContent] = []
+    def _search_and_fetch(self, search_criteria: str, sender: str) -> Iterator[EmailContent]:
+        """
+        Helper to search and fetch emails by criteria, batch by batch.
+        
+        Only UIDs above the last handled one for this sender are searched
+        (UID N:*), so a steady-state poll scans just the new messages.
+        """
         if not self._connection:
-            return emails
+            return
+        
+        validity = _uid_validity.get((self.host, self.user, self.folder))
+        mark_key = (self.host, self.user, self.folder, sender)
+        last_uid = 0
+        mark = _last_uids.get(mark_key)
+        if mark is not None and mark[0] == validity:
+            last_uid = mark[1]
+            search_criteria += f" UID {last_uid + 1}:*"
             
         try:
-            _, message_numbers = self._connection.search(None, search_criteria)
-            
-            for num in message_numbers[0].split():
+            _, uid_data = self._connection.uid("search", None, f"({search_criteria})")
+            # N:* always matches the highest UID, even when it is below N
+            # (a NO reply carries text here and ends up in except)
+            uids = [uid for uid in uid_data[0].split() if int(uid) > last_uid]
+        except Exception:
+            return
+        for start in range(0, len(uids), _FETCH_BATCH):
+            emails, handled = self._fetch_batch(uids[start:start + _FETCH_BATCH])
+            if handled and validity is not None:
+                last_uid = max(last_uid, handled)
+                _last_uids[mark_key] = (validity, last_uid)
+            yield from emails
+    
+    def _fetch_batch(self, uids: list[bytes]) -> tuple[list[EmailContent], int]:
+        """
+        Fetch and parse one batch of messages by UID, marking them as read.
+        
+        Returns:
+            Tuple of (parsed emails, highest UID marked as read or 0)
+        """
+        emails: list[EmailContent] = []
+        if not self._connection:
+            return emails, 0
+        
+        processed: list[bytes] = []
+        try:
+            # One FETCH per batch; PEEK leaves \Seen untouched until parsed
+            _, msg_data = self._connection.uid("fetch", b",".join(uids), "(BODY.PEEK[])")
+
+            # Response alternates (b'N (UID u BODY[] {size}', raw) tuples and
+            # b')' separators; servers may send UID after the body instead,
+            # in the following b' UID u)' element
+            msg_data = msg_data or []
+            for index, item in enumerate(msg_data):
+                if not isinstance(item, tuple):
+                    continue
+                
                 try:
-                    _, msg_data = self._connection.fetch(num, "(RFC822)")
-                    
-                    if not msg_data or not msg_data[0]:
+                    uid_match = _FETCH_UID_RE.search(item[0])
+                    if uid_match is None and index + 1 < len(msg_data):
+                        following = msg_data[index + 1]
+                        if isinstance(following, bytes):
+                            uid_match = _FETCH_UID_RE.search(following)
+                    if uid_match is None:
                         continue
-                    
-                    raw_email = msg_data[0][1]
+                    uid = uid_match.group(1)
+                    raw_email = item[1]
                     if isinstance(raw_email, bytes):
                         msg = email.message_from_bytes(raw_email)
                     else:
@@ -378,17 +500,19 @@ class EmailMonitor:
                         attachments_text=attachments,
                         raw_body=plain_text + "\n" + html_text,
                     ))
-                    
-                    # Mark as read
-                    self._connection.store(num, "+FLAGS", "\\Seen")
+                    processed.append(uid)
                     
                 except Exception:
                     continue
+            
+            # Mark the parsed batch as read in one STORE
+            if processed:
+                self._connection.uid("store", b",".join(processed), "+FLAGS", "\\Seen")
                     
         except Exception:
-            pass
+            return emails, 0
             
-        return emails
+        return emails, max((int(uid) for uid in processed), default=0)
     
     def process_email(self, email_content: EmailContent) -> OrderData:
         """
@@ -400,8 +524,10 @@ class EmailMonitor:
         Returns:
             OrderData with extracted phone, products, and total
         """
-        # Try Katren parser first (for HTML emails)
-        phone, products, total = parse_katren_email(email_content.raw_body)
+        # Try Katren parser first (raw_body is empty for attachment-only emails)
+        phone, products, total = None, [], 0.0
+        if email_content.raw_body.strip():
+            phone, products, total = parse_katren_email(email_content.raw_body)
         
         # Fallback to basic extraction if Katren parser didn't find phone
         if not phone:
@@ -428,6 +554,7 @@ async def monitor_loop(
     monitor: EmailMonitor,
     callback,
     check_interval: int = 60,
+    on_batch_end=None,
 ) -> None:
     """
     Continuous monitoring loop.
@@ -436,6 +563,8 @@ async def monitor_loop(
         monitor: EmailMonitor instance
         callback: Async callback function(OrderData) for processing
         check_interval: Seconds between checks
+        on_batch_end: Optional async callback run after every check, e.g. to
+            write orders buffered by callback in one request
     """
     import logging
     logger = logging.getLogger(__name__)
@@ -461,7 +590,8 @@ async def monitor_loop(
                     continue
                     
                 logger.info(f"📧 Processing: {email_content.subject[:50]}...")
-                order_data = monitor.process_email(email_content)
+                # BeautifulSoup parsing is CPU-bound; keep it off the event loop
+                order_data = await asyncio.to_thread(monitor.process_email, email_content)
                 logger.info(f"📧 Extracted phone: {order_data.phone}, products: {len(order_data.products)}")
                 await callback(order_data)
 
@@ -472,5 +602,12 @@ async def monitor_loop(
             logger.error(f"📧 Error in monitor loop: {e}")
             # Reconnect on error
             monitor.disconnect()
+        
+        # Runs after errors too: emails handled so far are already marked read
+        if on_batch_end is not None:
+            try:
+                await on_batch_end()
+            except Exception as e:
+                logger.error(f"📧 Error after email check: {e}")
             
         await asyncio.sleep(check_interval)
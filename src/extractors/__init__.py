@@ -1,12 +1,13 @@
 """Extractors package - извлечение структурированных данных из текста."""
 
-from .phone import extract_phone, normalize_phone
+from .phone import digits_only, extract_phone, normalize_phone
 from .order import extract_order_number
 from .products import extract_products, extract_total, format_products_for_notification, ProductItem
 
 __all__ = [
     "extract_phone", 
     "normalize_phone", 
+    "digits_only",
     "extract_order_number",
     "extract_products", 
     "extract_total", 
@@ -22,7 +22,9 @@ ORDER_PATTERNS: list[Pattern[str]] = [
     re.compile(r'[Oo]rder\s*[№#:\s]+(\d{4,15})', re.IGNORECASE),
     
     # ID: 12345 / ID заказа: 12345
-    re.compile(r'\bID[:\s]+(\d{4,15})\b', re.IGNORECASE),
+    # Граница слова проверяется lookbehind'ом после литерала "ID" (вместо
+    # \b в начале) — так SRE ищет сначала литерал, а не проверяет \b везде
+    re.compile(r'ID(?<!\w..)[:\s]+(\d{4,15})\b', re.IGNORECASE),
     
     # № 12345 (просто номер со знаком №)
     re.compile(r'№\s*(\d{5,15})'),
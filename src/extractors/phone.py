@@ -1,26 +1,54 @@
 """Phone number extraction and normalization."""
 
 import re
-from typing import Pattern
-
-# Паттерны для различных форматов телефонов
-# Порядок важен: более специфичные паттерны первыми
-
-PHONE_PATTERNS: list[Pattern[str]] = [
-    # Универсальный паттерн для 11 цифр (начинается с 7 или 8)
-    # Ищет цифры, разделенные любым кол-вом пробелов, тире или скобок
-    re.compile(
-        r'(?:(?:\+7|8|7)[\s\-\(\)]*){1}(?:\d[\s\-\(\)]*){10}'
-    ),
-    # Универсальный паттерн для 10 цифр (начинается с 9)
-    re.compile(
-        r'\b(?:9[\s\-\(\)]*){1}(?:\d[\s\-\(\)]*){9}\b'
-    ),
-    # Стандартные форматы (оставляем для точности извлечения групп)
-    re.compile(
-        r'(?:\+7|8)\s*[\(\-]?\s*(\d{3})\s*[\)\-]?\s*(\d{3})\s*[\-]?\s*(\d{2})\s*[\-]?\s*(\d{2})'
-    ),
-]
+from typing import Iterator, Pattern
+
+# Единый паттерн для всех форматов телефонов, один проход по тексту:
+# - full: 11 цифр, начинается с +7, 8 или 7
+# - ten: 10 цифр, начинается с 9
+# Приоритет как у отдельных паттернов: full важнее ten, даже если ten
+# встречается раньше (10 цифр может оказаться номером заказа)
+# Цифры могут разделяться любым кол-вом пробелов, тире или скобок.
+# Группы national/ten содержат 10 цифр номера без кода страны
+_PHONE_RE: Pattern[str] = re.compile(
+    r'(?P<full>(?:\+7|8|7)[\s\-()]*(?P<national>(?:\d[\s\-()]*){10}))'
+    r'|(?P<ten>\b9[\s\-()]*(?:\d[\s\-()]*){9}\b)'
+)
+
+# Для кода, который перебирает паттерны (например, вырезает телефон из текста)
+PHONE_PATTERNS: list[Pattern[str]] = [_PHONE_RE]
+
+# Символы форматирования телефона, удаляемые через str.translate
+_PHONE_STRIP = str.maketrans('', '', ' -()+.\t\n\r\xa0')
+_NON_DIGIT_RE = re.compile(r'\D')
+
+# (кол-во цифр, первая цифра) -> сколько цифр отбросить перед "+7"
+# 10 цифр — номер без кода страны, первая цифра не важна
+_NORM_DROP: dict[tuple[int, str], int] = {
+    (10, ''): 0,
+    (11, '7'): 1,
+    (11, '8'): 1,
+    (12, '7'): 1,
+}
+
+
+def digits_only(text: str) -> str:
+    """
+    Keep only the digits of text.
+    
+    Phone formatting is removed with one str.translate call (a C loop);
+    the regex pass only runs when other characters remain.
+    
+    Args:
+        text: Any string, e.g. a formatted phone or a message line
+        
+    Returns:
+        Digits of text in their original order
+    """
+    digits = text.translate(_PHONE_STRIP)
+    if digits.isdecimal() or not digits:
+        return digits
+    return _NON_DIGIT_RE.sub('', digits)
 
 
 def normalize_phone(phone: str) -> str:
@@ -33,19 +61,33 @@ def normalize_phone(phone: str) -> str:
     Returns:
         Normalized phone in +7XXXXXXXXXX format
     """
-    # Remove all non-digit characters
-    digits = re.sub(r'\D', '', phone)
+    digits = digits_only(phone)
     
-    if len(digits) == 10:
-        # Assume Russian number without country code
-        return f"+7{digits}"
-    elif len(digits) == 11:
-        if digits.startswith('8') or digits.startswith('7'):
-            return f"+7{digits[1:]}"
-    elif len(digits) == 12 and digits.startswith('7'):
-        return f"+{digits}"
+    n = len(digits)
+    drop = _NORM_DROP.get((n, digits[:1] if n > 10 else ''))
+    if drop is None:
+        return phone  # Return original if can't normalize
     
-    return phone  # Return original if can't normalize
+    return "+7" + digits[drop:]
+
+
+def _phone_from_match(match: re.Match[str]) -> str:
+    """Build +7XXXXXXXXXX from a _PHONE_RE match without re-parsing the prefix."""
+    return "+7" + digits_only(match.group("national") or match.group("ten"))
+
+
+def _iter_phone_matches(text: str) -> Iterator[re.Match[str]]:
+    """Lazily yield _PHONE_RE matches in order of appearance."""
+    # Every phone match starts with 7, 8 or 9: skip the regex if none occur
+    if not text or ('7' not in text and '8' not in text and '9' not in text):
+        return
+    yield from _PHONE_RE.finditer(text)
+
+
+def _iter_phones(text: str) -> Iterator[str]:
+    """Lazily yield +7XXXXXXXXXX phones in order of appearance (with repeats)."""
+    for match in _iter_phone_matches(text):
+        yield _phone_from_match(match)
 
 
 def extract_phone(text: str) -> str | None:
@@ -66,16 +108,16 @@ def extract_phone(text: str) -> str | None:
     Returns:
         Normalized phone in +7XXXXXXXXXX format or None
     """
-    if not text:
-        return None
-    
-    for pattern in PHONE_PATTERNS:
-        match = pattern.search(text)
-        if match:
-            raw_number = match.group(0)
-            return normalize_phone(raw_number)
+    # First 11-digit number wins (scan stops there); a 10-digit one is
+    # only used when the text has no 11-digit number at all
+    first_ten = None
+    for match in _iter_phone_matches(text):
+        if match.group("full"):
+            return _phone_from_match(match)
+        if first_ten is None:
+            first_ten = match
     
-    return None
+    return _phone_from_match(first_ten) if first_ten else None
 
 
 def extract_all_phones(text: str) -> list[str]:
@@ -86,19 +128,8 @@ def extract_all_phones(text: str) -> list[str]:
         text: Text containing phone numbers
         
     Returns:
-        List of normalized phone numbers
+        List of normalized phone numbers in order of appearance
     """
-    if not text:
-        return []
-    
-    phones: set[str] = set()
-    
-    for pattern in PHONE_PATTERNS:
-        for match in pattern.finditer(text):
-            groups = match.groups()
-            raw_number = ''.join(groups)
-            normalized = normalize_phone(raw_number)
-            if normalized.startswith('+7') and len(normalized) == 12:
-                phones.add(normalized)
-    
-    return list(phones)
+    # _PHONE_RE only matches 10/11-digit shapes, so every match converts
+    # to +7XXXXXXXXXX; dict.fromkeys de-duplicates keeping first occurrence
+    return list(dict.fromkeys(_iter_phones(text)))
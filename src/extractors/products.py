@@ -3,8 +3,36 @@
 import re
 from dataclasses import dataclass
 
+# Table row with at least 7 columns: Товар, Производитель, Кол-во, Цена аптеки,
+# Сумма аптеки, Цена клиента, Сумма клиента (extra columns like ШК are ignored)
+_ROW_RE = re.compile(
+    r'^([^|\n]*)\|([^|\n]*)\|([^|\n]*)\|([^|\n]*)\|([^|\n]*)\|([^|\n]*)\|([^|\n]*)',
+    re.MULTILINE,
+)
 
-@dataclass
+# Price cleanup: comma as decimal separator, spaces as thousands separator
+_PRICE_STRIP = str.maketrans({',': '.', ' ': None})
+
+# Pattern: ИТОГО:| | | | 1105,07| | 1199|
+# Explicit case variants are cheaper than IGNORECASE Unicode folding
+_TOTAL_RE = re.compile(r'(?:ИТОГО|Итого|итого)[:\s|]+[\d\s,.|]*?([\d,]+)[^\d]*([\d,]+)')
+
+
+def _parse_int(s: str) -> int:
+    """Parse quantity, defaulting to 1."""
+    s = s.strip()
+    return int(s) if s.isdecimal() else 1
+
+
+def _parse_price(s: str) -> float:
+    """Parse price with comma decimal separator, defaulting to 0.0."""
+    try:
+        return float(s.strip().translate(_PRICE_STRIP) or '0')
+    except ValueError:
+        return 0.0
+
+
+@dataclass(slots=True)
 class ProductItem:
     """Single product from order."""
     name: str
@@ -39,68 +67,48 @@ def extract_products(text: str) -> list[ProductItem]:
     """
     products: list[ProductItem] = []
     
-    # Find table rows (lines with | separator)
-    lines = text.split('\n')
+    if '|' not in text:
+        return products
     
-    for line in lines:
-        # Skip lines without table separator
-        if '|' not in line:
-            continue
-            
+    # Find table rows (lines with at least 6 | separators)
+    for match in _ROW_RE.finditer(text):
+        line = match.group(0)
+        
         # Skip header row
         if 'Товар' in line and 'Производитель' in line:
             continue
             
         # Skip separator rows
-        if line.strip().startswith('---') or line.strip() == '---|---|---|---|---|---|---|---':
+        if line.lstrip().startswith('---'):
             continue
             
         # Skip ИТОГО row
-        upper_line = line.upper()
-        if 'ИТОГО' in upper_line:
+        if 'ИТОГО' in line.upper():
             continue
         
-        # Parse table row
-        parts = [p.strip() for p in line.split('|')]
+        parts = [p.strip() for p in match.groups()]
         
-        # Need at least 7 columns: Товар, Производитель, Кол-во, Цена аптеки, Сумма аптеки, Цена клиента, Сумма клиента
-        if len(parts) >= 7:
-            try:
-                name = parts[0].strip()
-                if not name or len(name) < 3:
-                    continue
-                    
-                # Try to parse numbers (handle comma as decimal)
-                def parse_int(s: str) -> int:
-                    s = s.strip()
-                    try:
-                        return int(s) if s.isdigit() else 1
-                    except:
-                        return 1
-                
-                def parse_price(s: str) -> float:
-                    s = s.strip().replace(',', '.').replace(' ', '')
-                    try:
-                        return float(s) if s else 0.0
-                    except:
-                        return 0.0
-                
-                quantity = parse_int(parts[2])
-                price_pharmacy = parse_price(parts[3])
-                price_client = parse_price(parts[5])
-                total_client = parse_price(parts[6])
-                
-                # Validate - at least one price should be > 0
-                if price_pharmacy > 0 or price_client > 0 or total_client > 0:
-                    products.append(ProductItem(
-                        name=name,
-                        quantity=quantity,
-                        price_pharmacy=price_pharmacy,
-                        price_client=price_client,
-                        total_client=total_client,
-                    ))
-            except (IndexError, ValueError):
+        try:
+            name = parts[0]
+            if not name or len(name) < 3:
                 continue
+            
+            quantity = _parse_int(parts[2])
+            price_pharmacy = _parse_price(parts[3])
+            price_client = _parse_price(parts[5])
+            total_client = _parse_price(parts[6])
+            
+            # Validate - at least one price should be > 0
+            if price_pharmacy > 0 or price_client > 0 or total_client > 0:
+                products.append(ProductItem(
+                    name=name,
+                    quantity=quantity,
+                    price_pharmacy=price_pharmacy,
+                    price_client=price_client,
+                    total_client=total_client,
+                ))
+        except (IndexError, ValueError):
+            continue
     
     return products
 
@@ -112,16 +120,9 @@ def extract_total(text: str) -> tuple[float, float]:
     Returns:
         (total_pharmacy, total_client)
     """
-    # Pattern: ИТОГО:| | | | 1105,07| | 1199|
-    match = re.search(r'ИТОГО[:\s|]+[\d\s,.|]*?([\d,]+)[^\d]*([\d,]+)', text, re.IGNORECASE)
+    match = _TOTAL_RE.search(text)
     if match:
-        def parse_price(s: str) -> float:
-            s = s.strip().replace(',', '.').replace(' ', '')
-            try:
-                return float(s)
-            except:
-                return 0.0
-        return parse_price(match.group(1)), parse_price(match.group(2))
+        return _parse_price(match.group(1)), _parse_price(match.group(2))
     
     return 0.0, 0.0
 
@@ -11,15 +11,17 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+import httpx
+
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import load_config
 from email_monitor import EmailMonitor
 from extractors import extract_phone, extract_order_number, extract_products, extract_total, format_products_for_notification
-from database.sheets import get_client, get_sheet, add_order, find_order_by_number, update_order_status, get_pending_orders, OrderRow
+from database.sheets import get_client, get_sheet, add_orders, get_order_numbers, update_order_status, get_pending_orders, OrderRow
 from senders.whatsapp import send_whatsapp, check_whatsapp_status
-from senders.sms_gateway import send_sms_gateway
+from senders.sms_gateway import send_sms_batch
 
 # Setup logging
 logging.basicConfig(
@@ -45,27 +47,28 @@ async def process_new_emails(config, sheet):
         from_filter=config.email_from_filter,
     )
     
+    # New orders are collected and written to the sheet in one request
+    new_orders: list[OrderRow] = []
+    email_count = 0
+    
     try:
         monitor.connect()
-        emails = monitor.fetch_unread_emails()
-        
-        if not emails:
-            logger.info("Новых писем нет")
-            return 0
-        
-        added_count = 0
-        for email_content in emails:
-            # Parse email
-            full_text = "\n".join([
-                email_content.subject,
-                email_content.body_text,
-                email_content.attachments_text,
-            ])
+        # One sheet read for duplicate checks instead of a lookup per email
+        existing_numbers = get_order_numbers(sheet)
+        # Emails are streamed: each one is parsed and dropped before the next
+        for email_content in monitor.fetch_unread_iter():
+            email_count += 1
+            # Parse email: the order table lives in body/attachments only
+            table_text = email_content.body_text
+            if email_content.attachments_text:
+                table_text = f"{table_text}\n{email_content.attachments_text}"
             
-            phone = extract_phone(full_text)
-            order_number = extract_order_number(full_text)
-            products = extract_products(full_text)
-            _, total_client = extract_total(full_text)
+            # Subject first (short); the body is scanned only if the subject lacks it
+            subject = email_content.subject
+            phone = extract_phone(subject) or extract_phone(table_text)
+            order_number = extract_order_number(subject) or extract_order_number(table_text)
+            _, total_client = extract_total(table_text)
+            products = extract_products(table_text)
             
             if not phone:
                 logger.warning(f"Телефон не найден в письме: {email_content.subject}")
@@ -75,16 +78,16 @@ async def process_new_emails(config, sheet):
                 logger.warning(f"Номер заказа не найден в письме: {email_content.subject}")
                 continue
             
-            # Check for duplicates
-            existing = find_order_by_number(sheet, order_number)
-            if existing:
-                logger.info(f"Заказ {order_number} уже существует в строке {existing}")
+            # Check for duplicates (sheet and orders queued in this check)
+            if order_number in existing_numbers:
+                logger.info(f"Заказ {order_number} уже существует")
                 continue
+            existing_numbers.add(order_number)
             
             # Format products for display
             products_text = ", ".join([f"{p.name[:20]} x{p.quantity}" for p in products])
             
-            # Add to spreadsheet
+            # Queue for the spreadsheet
             order = OrderRow(
                 date=datetime.now().strftime("%d.%m.%Y %H:%M"),
                 order_number=order_number,
@@ -97,14 +100,24 @@ async def process_new_emails(config, sheet):
                 note="",
             )
             
-            row = add_order(sheet, order)
-            logger.info(f"✅ Добавлен заказ {order_number} для {phone} (строка {row})")
-            added_count += 1
+            new_orders.append(order)
         
-        return added_count
-        
-    finally:
+    except Exception:
+        # Drop the shared IMAP session on errors; it is reused otherwise
         monitor.disconnect()
+        raise
+    finally:
+        # Emails are already marked as read: save what was parsed even on error
+        if new_orders:
+            first_row = add_orders(sheet, new_orders)
+            for i, order in enumerate(new_orders):
+                row = first_row + i if first_row else "?"
+                logger.info(f"✅ Добавлен заказ {order.order_number} для {order.phone} (строка {row})")
+    
+    if not email_count:
+        logger.info("Новых писем нет")
+    
+    return len(new_orders)
 
 
 async def send_notifications(config, sheet):
@@ -121,21 +134,21 @@ async def send_notifications(config, sheet):
     sent_count = 0
     failed_count = 0
     
-    for row_num, order in pending:
-        logger.info(f"Отправляю SMS: заказ {order.order_number} на {order.phone}...")
-        
-        # Format short SMS message
-        message = f"Заказ {order.order_number} готов! Сумма: {order.total:.0f}р. Ждём в аптеке!"
-        
-        # Send SMS
-        sms_result = await send_sms_gateway(
-            phone=order.phone,
-            message=message,
+    # Format short SMS messages and send them concurrently
+    messages = [
+        (order.phone, f"Заказ {order.order_number} готов! Сумма: {order.total:.0f}р. Ждём в аптеке!")
+        for _, order in pending
+    ]
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        results = await send_sms_batch(
+            messages,
             api_key=config.smsgateway_api_key,
+            client=client,
         )
-        
+    
+    for (row_num, order), sms_result in zip(pending, results):
         if sms_result.success:
-            logger.info(f"✅ SMS отправлен: {order.order_number}")
+            logger.info(f"✅ SMS отправлен: {order.order_number} на {order.phone}")
             update_order_status(
                 sheet, row_num, 
                 sms_status="✅", 
@@ -143,12 +156,9 @@ async def send_notifications(config, sheet):
             )
             sent_count += 1
         else:
-            logger.error(f"❌ SMS не отправлен: {sms_result.error}")
+            logger.error(f"❌ SMS не отправлен: {order.order_number}: {sms_result.error}")
             update_order_status(sheet, row_num, sms_status="❌")
             failed_count += 1
-        
-        # Small delay between messages
-        await asyncio.sleep(2)
     
     logger.info(f"📊 Итого: отправлено {sent_count}, ошибок {failed_count}")
 
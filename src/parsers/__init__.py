@@ -1,8 +1,28 @@
 """Parsers package - извлечение текста из различных форматов."""
 
-from .html_parser import parse_html
-from .pdf_parser import parse_pdf, parse_pdf_bytes
-from .docx_parser import parse_docx, parse_docx_bytes
+from importlib import import_module
+
+# Парсеры загружаются лениво (PEP 562): импорт пакета не тянет
+# lxml, pypdfium2 и python-docx, пока функция не понадобится
+_EXPORTS = {
+    "parse_html": ".html_parser",
+    "parse_pdf": ".pdf_parser",
+    "parse_pdf_bytes": ".pdf_parser",
+    "parse_docx": ".docx_parser",
+    "parse_docx_bytes": ".docx_parser",
+}
 
 __all__ = ["parse_html", "parse_pdf", "parse_pdf_bytes", "parse_docx", "parse_docx_bytes"]
 
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # Cache: next access skips __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -4,7 +4,12 @@ from pathlib import Path
 from typing import BinaryIO
 import io
 
-from docx import Document
+# WordprocessingML tags, same as docx.oxml.ns.qn("w:...") without importing docx
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_TBL = _W_NS + "tbl"
+_W_TR = _W_NS + "tr"
+_W_TC = _W_NS + "tc"
+_W_P = _W_NS + "p"
 
 
 def parse_docx(source: str | Path | BinaryIO) -> str:
@@ -18,6 +23,10 @@ def parse_docx(source: str | Path | BinaryIO) -> str:
         Extracted plain text
     """
     try:
+        # Imported on first use: python-docx is slow to load and most
+        # emails have no DOCX attachment
+        from docx import Document
+        
         doc = Document(source)
         text_parts: list[str] = []
         
@@ -25,12 +34,15 @@ def parse_docx(source: str | Path | BinaryIO) -> str:
             if paragraph.text.strip():
                 text_parts.append(paragraph.text)
         
-        # Also extract from tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = " | ".join(
-                    cell.text.strip() for cell in row.cells if cell.text.strip()
+        # Also extract from tables: walk the XML directly, python-docx
+        # row.cells rebuilds the whole table grid on every call
+        for tbl in doc.element.body.findall(_W_TBL):
+            for tr in tbl.findall(_W_TR):
+                cells = (
+                    "\n".join(p.text for p in tc.findall(_W_P)).strip()
+                    for tc in tr.findall(_W_TC)
                 )
+                row_text = " | ".join(c for c in cells if c)
                 if row_text:
                     text_parts.append(row_text)
         
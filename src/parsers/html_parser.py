@@ -1,52 +1,114 @@
 """HTML to plain text parser."""
 
-from bs4 import BeautifulSoup
-import html2text
+import re
+
+import lxml.html
+from lxml import etree
+
+_WS_RE = re.compile(r'\s+')
+_HSPACE_RE = re.compile(r'[^\S\n]+')  # Whitespace except newlines
+
+# Tags dropped together with their content
+_UNWANTED_TAGS = ("script", "style", "head", "meta", "link")
+
+# Whole <script>/<style> blocks in raw HTML. The body is bounded so the
+# match cannot run past the matching close tag (no catastrophic backtracking)
+_SCRIPT_STYLE_RE = re.compile(
+    r'<(script|style)\b[^>]*>[^<]*(?:<(?!/\1\s*>)[^<]*)*</\1\s*>',
+    re.IGNORECASE,
+)
+
+# lxml rejects str input that carries an XML encoding declaration (XHTML mail)
+_XML_DECL_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+_BLOCK_TAGS = (
+    "p", "div", "br", "li", "tr", "table",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+)
+
+
+def _lxml_to_text(html_content: str) -> str:
+    """Render HTML with lxml: table rows as "cell| cell" lines, blocks on new lines."""
+    if html_content.lstrip().startswith("<?xml"):
+        html_content = _XML_DECL_RE.sub("", html_content, count=1)
+    root = lxml.html.document_fromstring(html_content)
+
+    # Remove script and style elements (and comments), keeping text after them
+    etree.strip_elements(root, *_UNWANTED_TAGS, etree.Comment, with_tail=False)
+
+    # Line break before and after every block element (inside a cell the
+    # breaks collapse to spaces, so "a<br>b" stays two words)
+    for element in root.iter(*_BLOCK_TAGS):
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + "\n"
+        elif element.getparent() is not None:
+            parent = element.getparent()
+            parent.text = (parent.text or "") + "\n"
+        element.tail = "\n" + (element.tail or "")
+
+    # Leaf table rows become one pipe-separated line (format extract_products
+    # expects); layout rows wrapping nested tables keep "| " between cells
+    for row in list(root.iter("tr")):
+        if row.find(".//table") is None:
+            cells = [
+                " ".join(cell.text_content().split())
+                for cell in row if cell.tag in ("td", "th")
+            ]
+            tail = row.tail
+            row.clear()
+            row.text = "| ".join(cells)
+            row.tail = tail
+        else:
+            # Rows wrapping nested tables: keep a separator between cells
+            cells = [cell for cell in row if cell.tag in ("td", "th")]
+            for cell in cells[:-1]:
+                cell.tail = "| " + (cell.tail or "")
+
+    # Clean up multiple spaces and drop empty lines
+    lines = (_HSPACE_RE.sub(' ', line).strip() for line in root.text_content().split("\n"))
+    return "\n".join(line for line in lines if line)
 
 
 def parse_html(html_content: str) -> str:
     """
     Convert HTML content to plain text.
-    
-    Uses html2text for better formatting preservation,
-    falls back to BeautifulSoup for simple extraction.
-    
+
+    Uses lxml (C parser) and keeps the structure the extractors rely on:
+    line breaks between blocks and "cell| cell" table rows. Falls back
+    to BeautifulSoup for input lxml rejects.
+
     Args:
         html_content: Raw HTML string
-        
+
     Returns:
         Clean plain text
     """
     if not html_content:
         return ""
-    
-    # Try html2text first (better at preserving structure)
+
     try:
-        h = html2text.HTML2Text()
-        h.ignore_links = True
-        h.ignore_images = True
-        h.ignore_emphasis = True
-        h.body_width = 0  # No wrapping
-        text = h.handle(html_content)
-        return text.strip()
+        return _lxml_to_text(html_content)
     except Exception:
         pass
-    
-    # Fallback to BeautifulSoup
+
+    # Fallback to BeautifulSoup (imported only when lxml fails)
     try:
-        soup = BeautifulSoup(html_content, "html.parser")
+        from bs4 import BeautifulSoup
         
-        # Remove script and style elements
-        for element in soup(["script", "style", "head", "meta", "link"]):
+        # Cut script/style in one regex pass so html.parser never tokenizes them
+        soup = BeautifulSoup(_SCRIPT_STYLE_RE.sub("", html_content), "html.parser")
+
+        # Remove the remaining unwanted elements
+        for element in soup(_UNWANTED_TAGS):
             element.decompose()
-        
+
         # Get text with spaces between elements
         text = soup.get_text(separator=" ", strip=True)
-        
+
         # Clean up multiple spaces
-        import re
-        text = re.sub(r'\s+', ' ', text)
-        
+        text = _WS_RE.sub(' ', text)
+
         return text.strip()
     except Exception:
         return html_content
@@ -1,44 +1,73 @@
 """PDF to plain text parser."""
 
+import threading
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Iterator
 
-import pdfplumber
+# PDFium is not thread-safe, and attachments are parsed from a thread pool
+_PDFIUM_LOCK = threading.Lock()
 
 
-def parse_pdf(source: str | Path | BinaryIO) -> str:
+def iter_pdf_pages(source: str | Path | bytes | BinaryIO) -> Iterator[str]:
+    """
+    Yield text of each non-empty PDF page, one page at a time.
+
+    Callers that only need the first page (order number, phone) can stop
+    early without extracting the rest. PDFium calls hold the lock, but
+    it is released between pages, so a paused generator blocks nobody.
+
+    Args:
+        source: File path, PDF bytes or file-like object
+
+    Yields:
+        Page text with \n line separators
+    """
+    # Imported on first use: most emails have no PDF attachment
+    import pypdfium2 as pdfium
+
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+        n_pages = len(pdf)
+    try:
+        for index in range(n_pages):
+            with _PDFIUM_LOCK:
+                page = pdf[index]
+                textpage = page.get_textpage()
+                page_text = textpage.get_text_range()
+                textpage.close()
+                page.close()
+            if page_text:
+                # PDFium separates lines with \r\n
+                yield page_text.replace("\r\n", "\n")
+    finally:
+        with _PDFIUM_LOCK:
+            pdf.close()
+
+
+def parse_pdf(source: str | Path | bytes | BinaryIO) -> str:
     """
     Extract text from PDF file.
-    
+
     Args:
-        source: File path or file-like object
+        source: File path, PDF bytes or file-like object
         
     Returns:
         Extracted plain text
     """
-    text_parts: list[str] = []
-    
     try:
-        with pdfplumber.open(source) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+        return "\n\n".join(iter_pdf_pages(source))
     except Exception as e:
         return f"[PDF parsing error: {e}]"
-    
-    return "\n\n".join(text_parts)
 
 
 def parse_pdf_bytes(content: bytes) -> str:
     """
     Extract text from PDF bytes.
-    
+
     Args:
         content: PDF file content as bytes
-        
+
     Returns:
         Extracted plain text
     """
-    import io
-    return parse_pdf(io.BytesIO(content))
+    return parse_pdf(content)
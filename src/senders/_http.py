@@ -0,0 +1,61 @@
+"""Shared HTTP client helpers for senders."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+# Keep-alive clients per service, with the event loop each was created in
+_shared: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def shared_client(service_url: str, **kwargs) -> httpx.AsyncClient:
+    """
+    Get the keep-alive client for a service, creating it on first use.
+
+    Sequential sends reuse one TLS connection instead of a handshake per
+    message. Connections are bound to the event loop that opened them,
+    so a new client is created when called from a different loop.
+
+    Args:
+        service_url: Service root, e.g. "https://api.green-api.com"
+        **kwargs: Arguments for httpx.AsyncClient on creation
+    """
+    loop = asyncio.get_running_loop()
+    entry = _shared.get(service_url)
+    if entry is None or entry[0] is not loop or entry[1].is_closed:
+        entry = (loop, httpx.AsyncClient(**kwargs))
+        _shared[service_url] = entry
+    return entry[1]
+
+
+async def aclose_shared(service_url: str | None = None) -> None:
+    """Close the shared client for a service, or all of them if None."""
+    urls = [service_url] if service_url is not None else list(_shared)
+    for url in urls:
+        entry = _shared.pop(url, None)
+        if entry is not None:
+            await entry[1].aclose()
+
+
+@asynccontextmanager
+async def use_client(
+    client: httpx.AsyncClient | None,
+    **kwargs,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Yield the given client, or a temporary one closed on exit.
+
+    Lets senders reuse a caller's keep-alive connection pool while still
+    working standalone.
+
+    Args:
+        client: Shared client or None
+        **kwargs: Arguments for the temporary httpx.AsyncClient
+    """
+    if client is not None:
+        yield client
+    else:
+        async with httpx.AsyncClient(**kwargs) as new_client:
+            yield new_client
@@ -1,9 +1,12 @@
 """SMS sender with multiple providers support."""
 
+import functools
 import httpx
 from dataclasses import dataclass
 from enum import Enum
 
+from ._http import use_client
+
 
 class SmsProvider(Enum):
     """Supported SMS providers."""
@@ -11,7 +14,13 @@ class SmsProvider(Enum):
     SIGMA = "sigmasms.ru"  # Дешевле: от 1.5₽
 
 
-@dataclass
+@functools.lru_cache(maxsize=4)
+def _sigma_auth(login: str, password: str) -> httpx.BasicAuth:
+    """Build the Basic auth for SigmaSMS credentials."""
+    return httpx.BasicAuth(login, password)
+
+
+@dataclass(slots=True, frozen=True)
 class SmsResult:
     """Result of SMS send operation."""
     success: bool
@@ -26,6 +35,7 @@ async def send_sms_sigma(
     message: str,
     login: str,
     password: str,
+    client: httpx.AsyncClient | None = None,
 ) -> SmsResult:
     """
     Send SMS via SigmaSMS (от 1.5₽/SMS).
@@ -35,6 +45,7 @@ async def send_sms_sigma(
         message: Message text
         login: SigmaSMS login
         password: SigmaSMS password
+        client: Shared HTTP client (a temporary one is used if None)
         
     Returns:
         SmsResult
@@ -60,11 +71,12 @@ async def send_sms_sigma(
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
+        async with use_client(client) as http:
+            response = await http.post(
                 url,
                 json=payload,
-                auth=(login, password)
+                auth=_sigma_auth(login, password),
+                timeout=30.0,
             )
             
             if response.status_code in (200, 201):
@@ -90,6 +102,7 @@ async def send_sms(
     phone: str,
     message: str,
     api_id: str,
+    client: httpx.AsyncClient | None = None,
 ) -> SmsResult:
     """
     Send SMS via SMS.ru API.
@@ -98,6 +111,7 @@ async def send_sms(
         phone: Phone number in +7XXXXXXXXXX format
         message: Message text (max ~70 chars for 1 SMS in cyrillic)
         api_id: SMS.ru API ID
+        client: Shared HTTP client (a temporary one is used if None)
         
     Returns:
         SmsResult with success status and SMS ID or error
@@ -121,8 +135,8 @@ async def send_sms(
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, params=params)
+        async with use_client(client) as http:
+            response = await http.get(url, params=params, timeout=30.0)
             
             if response.status_code == 200:
                 data = response.json()
@@ -154,12 +168,16 @@ async def send_sms(
         return SmsResult(success=False, error=str(e), provider="sms.ru")
 
 
-async def get_sms_balance(api_id: str) -> float | None:
+async def get_sms_balance(
+    api_id: str,
+    client: httpx.AsyncClient | None = None,
+) -> float | None:
     """
     Get current SMS.ru balance.
     
     Args:
         api_id: SMS.ru API ID
+        client: Shared HTTP client (a temporary one is used if None)
         
     Returns:
         Balance in rubles or None on error
@@ -171,8 +189,8 @@ async def get_sms_balance(api_id: str) -> float | None:
     params = {"api_id": api_id, "json": 1}
     
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(url, params=params)
+        async with use_client(client) as http:
+            response = await http.get(url, params=params, timeout=15.0)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("status") == "OK":
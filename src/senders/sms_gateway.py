@@ -1,12 +1,25 @@
 """SMS Gateway via smstext.app."""
 
+import asyncio
 import base64
+import functools
 from dataclasses import dataclass
 
 import httpx
 
+from ._http import shared_client
 
-@dataclass
+SMS_GATEWAY_URL = "https://api.smstext.app"
+
+
+@functools.lru_cache(maxsize=4)
+def _auth_header(api_key: str) -> str:
+    """Build the Basic auth header value for an API key."""
+    auth_bytes = base64.b64encode(f"apikey:{api_key}".encode()).decode()
+    return f"Basic {auth_bytes}"
+
+
+@dataclass(slots=True, frozen=True)
 class SMSResult:
     """Result of SMS sending."""
     success: bool
@@ -18,6 +31,7 @@ async def send_sms(
     phone: str,
     message: str,
     api_key: str,
+    client: httpx.AsyncClient | None = None,
 ) -> SMSResult:
     """
     Send SMS via smstext.app gateway.
@@ -26,14 +40,12 @@ async def send_sms(
         phone: Phone number (e.g. +79991234567)
         message: Text message
         api_key: API key from smstext.app
+        client: HTTP client (the shared keep-alive client is used if None)
     """
-    url = "https://api.smstext.app/push"
-
-    auth_string = f"apikey:{api_key}"
-    auth_bytes = base64.b64encode(auth_string.encode()).decode()
+    url = f"{SMS_GATEWAY_URL}/push"
 
     headers = {
-        "Authorization": f"Basic {auth_bytes}",
+        "Authorization": _auth_header(api_key),
         "Content-Type": "application/json",
     }
 
@@ -43,20 +55,47 @@ async def send_sms(
     payload = [{"mobile": phone, "text": message}]
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url, json=payload, headers=headers, timeout=30,
-            )
+        http = client or shared_client(SMS_GATEWAY_URL, timeout=30.0)
+        response = await http.post(
+            url, json=payload, headers=headers, timeout=30,
+        )
 
-            if response.status_code == 200:
-                data = response.json()
-                if data and len(data) > 0:
-                    return SMSResult(success=True, message_id=data[0])
+        if response.status_code == 200:
+            data = response.json()
+            if data and len(data) > 0:
+                return SMSResult(success=True, message_id=data[0])
 
-            return SMSResult(
-                success=False,
-                error=f"HTTP {response.status_code}: {response.text}",
-            )
+        return SMSResult(
+            success=False,
+            error=f"HTTP {response.status_code}: {response.text}",
+        )
 
     except Exception as e:
         return SMSResult(success=False, error=str(e))
+
+
+async def send_sms_batch(
+    messages: list[tuple[str, str]],
+    api_key: str,
+    concurrency: int = 8,
+    client: httpx.AsyncClient | None = None,
+) -> list[SMSResult]:
+    """
+    Send several SMS concurrently via smstext.app gateway.
+
+    Args:
+        messages: List of (phone, text) pairs
+        api_key: API key from smstext.app
+        concurrency: Max requests in flight at once
+        client: HTTP client (the shared keep-alive client is used if None)
+
+    Returns:
+        SMSResult per message, in the same order as messages
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def run(phone: str, message: str) -> SMSResult:
+        async with sem:
+            return await send_sms(phone, message, api_key, client=client)
+
+    return list(await asyncio.gather(*(run(p, t) for p, t in messages)))
@@ -5,7 +5,7 @@ from aiogram import Bot
 from aiogram.exceptions import TelegramAPIError
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TelegramResult:
     """Result of Telegram send operation."""
     success: bool
@@ -1,10 +1,24 @@
 """WhatsApp sender via Green-API."""
 
+import asyncio
+import atexit
+import threading
+
 import httpx
 from dataclasses import dataclass
 
+from ._http import aclose_shared, shared_client
+
+GREEN_API_URL = "https://api.green-api.com"
+
+# Long-lived loop for sync_send_whatsapp: the loop and the shared client's
+# keep-alive connections survive between calls (asyncio.run tears both down)
+_runner = asyncio.Runner()
+_runner_lock = threading.Lock()
+_runner_used = False
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WhatsAppResult:
     """Result of WhatsApp sending."""
     success: bool
@@ -12,11 +26,30 @@ class WhatsAppResult:
     error: str | None = None
 
 
+def get_client() -> httpx.AsyncClient:
+    """Get the shared keep-alive Green-API client."""
+    return shared_client(
+        GREEN_API_URL,
+        limits=httpx.Limits(
+            max_keepalive_connections=20,
+            max_connections=100,
+            keepalive_expiry=60,
+        ),
+        timeout=httpx.Timeout(30.0, connect=5.0),
+    )
+
+
+async def aclose() -> None:
+    """Close the shared client (call on application shutdown)."""
+    await aclose_shared(GREEN_API_URL)
+
+
 async def send_whatsapp(
     phone: str,
     message: str,
     instance_id: str,
     token: str,
+    client: httpx.AsyncClient | None = None,
 ) -> WhatsAppResult:
     """
     Send WhatsApp message via Green-API.
@@ -26,6 +59,7 @@ async def send_whatsapp(
         message: Text message
         instance_id: Green-API instance ID
         token: Green-API token
+        client: Optional client; defaults to the shared module client
         
     Returns:
         WhatsAppResult with success status
@@ -33,7 +67,7 @@ async def send_whatsapp(
     # Clean phone number (remove + if present)
     phone_clean = phone.lstrip("+")
     
-    url = f"https://api.green-api.com/waInstance{instance_id}/sendMessage/{token}"
+    url = f"{GREEN_API_URL}/waInstance{instance_id}/sendMessage/{token}"
     
     payload = {
         "chatId": f"{phone_clean}@c.us",
@@ -41,22 +75,21 @@ async def send_whatsapp(
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("idMessage"):
-                    return WhatsAppResult(
-                        success=True,
-                        message_id=data["idMessage"],
-                    )
-            
-            return WhatsAppResult(
-                success=False,
-                error=f"HTTP {response.status_code}: {response.text}",
-            )
-            
+        response = await (client or get_client()).post(url, json=payload)
+        
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("idMessage"):
+                return WhatsAppResult(
+                    success=True,
+                    message_id=data["idMessage"],
+                )
+        
+        return WhatsAppResult(
+            success=False,
+            error=f"HTTP {response.status_code}: {response.text}",
+        )
+        
     except Exception as e:
         return WhatsAppResult(
             success=False,
@@ -88,5 +121,16 @@ def sync_send_whatsapp(
     token: str,
 ) -> WhatsAppResult:
     """Synchronous version of send_whatsapp."""
-    import asyncio
-    return asyncio.run(send_whatsapp(phone, message, instance_id, token))
+    global _runner_used
+    with _runner_lock:
+        _runner_used = True
+        return _runner.run(send_whatsapp(phone, message, instance_id, token))
+
+
+@atexit.register
+def _close_runner() -> None:
+    """Close the shared client and the sync loop on interpreter exit."""
+    with _runner_lock:
+        if _runner_used:
+            _runner.run(aclose())
+        _runner.close()
@@ -1,26 +1,55 @@
 """Quick test of email connection with multiple senders."""
-import imaplib
+import sys
+from email.parser import BytesHeaderParser
+sys.path.insert(0, 'src')
 
-HOST = "imap.gmail.com"
-USER = "lovelykimura832@gmail.com"
-PASSWORD = "ztrv pndd qslg jtsh"
+from config import load_config
+from email_client import close_imap, get_imap
+
+# Credentials come from .env (EMAIL_HOST, EMAIL_USER, EMAIL_PASSWORD)
+config = load_config()
+HOST = config.email_host
+USER = config.email_user
+PASSWORD = config.email_password
 FROM_FILTERS = ["s1963@yandex.ru", "nsv11061992@gmail.com"]
+FETCH_BATCH = 100  # Messages per IMAP FETCH
+
+
+def from_any(senders):
+    """Build one IMAP criterion matching any sender: OR FROM a OR FROM b FROM c."""
+    criteria = f'FROM "{senders[-1]}"'
+    for sender in reversed(senders[:-1]):
+        criteria = f'OR FROM "{sender}" {criteria}'
+    return f"({criteria})"
+
 
 print(f"Connecting to {HOST}...")
 try:
-    mail = imaplib.IMAP4_SSL(HOST)
-    mail.login(USER, PASSWORD)
+    mail = get_imap(HOST, USER, PASSWORD)
     print("✅ Login successful!")
     
-    mail.select("INBOX")
+    # One SEARCH for all senders, then From headers in batches for per-sender counts
+    _, messages = mail.search(None, from_any(FROM_FILTERS))
+    nums = messages[0].split() if messages[0] else []
+    
+    counts = dict.fromkeys(FROM_FILTERS, 0)
+    header_parser = BytesHeaderParser()
+    for i in range(0, len(nums), FETCH_BATCH):
+        batch = b",".join(nums[i:i + FETCH_BATCH])
+        _, msg_data = mail.fetch(batch, "(BODY.PEEK[HEADER.FIELDS (FROM)])")
+        for item in msg_data:
+            if not isinstance(item, tuple):
+                continue
+            # IMAP FROM is a case-insensitive substring match
+            sender_header = str(header_parser.parsebytes(item[1]).get("From", "")).lower()
+            for sender in FROM_FILTERS:
+                if sender.lower() in sender_header:
+                    counts[sender] += 1
     
-    total = 0
-    for sender in FROM_FILTERS:
-        _, messages = mail.search(None, f'(FROM "{sender}")')
-        count = len(messages[0].split()) if messages[0] else 0
+    for sender, count in counts.items():
         print(f"📧 {sender}: {count} писем")
-        total += count
     
+    total = len(nums)
     print(f"\n📊 Всего: {total} писем от обоих адресов")
     
     if total > 0:
@@ -28,6 +57,6 @@ try:
     else:
         print("⚠️ Отправь тестовое письмо с одного из адресов.")
     
-    mail.logout()
+    close_imap(HOST, USER)
 except Exception as e:
     print(f"❌ Error: {e}")
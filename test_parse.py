@@ -1,88 +1,121 @@
 """Test email parsing with attachments."""
-import imaplib
-import email
-from email.header import decode_header
+import binascii
+import tempfile
+from email import policy
+from email.parser import BytesFeedParser
 import sys
 sys.path.insert(0, 'src')
 
-from parsers import parse_html, parse_pdf_bytes, parse_docx_bytes
+from config import load_config
+from email_client import close_imap, get_imap
+from parsers import parse_html, parse_pdf, parse_docx
 from extractors import extract_phone, extract_order_number
 
-HOST = "imap.gmail.com"
-USER = "lovelykimura832@gmail.com"
-PASSWORD = "ztrv pndd qslg jtsh"
+# Credentials come from .env (EMAIL_HOST, EMAIL_USER, EMAIL_PASSWORD)
+config = load_config()
+HOST = config.email_host
+USER = config.email_user
+PASSWORD = config.email_password
 FROM_FILTERS = ["s1963@yandex.ru", "nsv11061992@gmail.com"]
+FETCH_BATCH = 100  # Messages per IMAP FETCH
+TEXT_TYPES = ("text/plain", "text/html")
+DOC_EXTENSIONS = (".pdf", ".docx")
+SPOOL_MAX_SIZE = 4 * 1024 * 1024  # Larger attachments spill to disk
+B64_CHUNK = 64 * 1024  # Encoded characters decoded per step
 
 
-def decode_header_str(header):
-    if not header:
-        return ""
-    decoded = []
-    for part, enc in decode_header(header):
-        if isinstance(part, bytes):
-            decoded.append(part.decode(enc or "utf-8", errors="replace"))
-        else:
-            decoded.append(part)
-    return " ".join(decoded)
+def fetch_raw(mail, nums, batch_size=FETCH_BATCH):
+    """Yield raw messages, one FETCH per batch_size messages."""
+    for i in range(0, len(nums), batch_size):
+        # PEEK: inspecting mail from a script must not mark it as read
+        _, msg_data = mail.fetch(b",".join(nums[i:i + batch_size]), "(BODY.PEEK[])")
+        # Response alternates (envelope, raw) tuples and b')' separators
+        for item in msg_data:
+            if isinstance(item, tuple):
+                yield item[1]
+
+
+def decode_to_spool(part):
+    """Decode attachment into a SpooledTemporaryFile chunk by chunk."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    if part.get("Content-Transfer-Encoding", "").strip().lower() == "base64":
+        data = part.get_payload()
+        tail = ""
+        for i in range(0, len(data), B64_CHUNK):
+            # Drop line breaks, decode whole 4-char groups, carry the rest
+            chunk = tail + "".join(data[i:i + B64_CHUNK].split())
+            cut = len(chunk) - len(chunk) % 4
+            spool.write(binascii.a2b_base64(chunk[:cut]))
+            tail = chunk[cut:]
+    else:
+        spool.write(part.get_payload(decode=True) or b"")
+    spool.seek(0)
+    return spool
 
 
 print("Connecting...")
-mail = imaplib.IMAP4_SSL(HOST)
-mail.login(USER, PASSWORD)
-mail.select("INBOX")
+mail = get_imap(HOST, USER, PASSWORD)
 
 for sender in FROM_FILTERS:
     _, messages = mail.search(None, f'(FROM "{sender}")')
-    for num in messages[0].split():
-        _, msg_data = mail.fetch(num, "(RFC822)")
-        raw = msg_data[0][1]
-        msg = email.message_from_bytes(raw)
+    for raw in fetch_raw(mail, messages[0].split()):
+        # policy.default decodes RFC 2047 headers to str while parsing
+        parser = BytesFeedParser(policy=policy.default)
+        parser.feed(raw)
+        msg = parser.close()
         
-        subj = decode_header_str(msg.get("Subject"))
+        subj = msg.get("Subject", "")
         print(f"\n{'='*50}")
         print(f"📧 От: {sender}")
         print(f"📝 Тема: {subj}")
         print(f"{'='*50}")
         
-        all_text = subj + "\n"
+        text_parts = [subj]
         
         for part in msg.walk():
             ctype = part.get_content_type()
             disp = str(part.get("Content-Disposition", ""))
+            fname = part.get_filename() or ""
+            
+            # Decode only parts we can use: body text and PDF/DOCX files
+            if ctype not in TEXT_TYPES and not fname.lower().endswith(DOC_EXTENSIONS):
+                continue
             
             try:
+                if "attachment" in disp:
+                    print(f"\n📎 Вложение: {fname}")
+                    
+                    if fname.lower().endswith(DOC_EXTENSIONS):
+                        # Decoded into a temp file; parsers read it as a file object
+                        with decode_to_spool(part) as spool:
+                            if fname.lower().endswith(".pdf"):
+                                text = parse_pdf(spool)
+                            else:
+                                text = parse_docx(spool)
+                        text_parts.append(text)
+                        print(f"   📄 Извлечено {len(text)} символов")
+                    continue
+                
                 payload = part.get_payload(decode=True)
                 if not payload:
                     continue
                 
                 charset = part.get_content_charset() or "utf-8"
                 
-                if "attachment" in disp:
-                    fname = part.get_filename() or ""
-                    print(f"\n📎 Вложение: {fname}")
-                    
-                    if fname.lower().endswith(".pdf"):
-                        text = parse_pdf_bytes(payload)
-                        all_text += text
-                        print(f"   📄 Извлечено {len(text)} символов")
-                    elif fname.lower().endswith(".docx"):
-                        text = parse_docx_bytes(payload)
-                        all_text += text
-                        print(f"   📄 Извлечено {len(text)} символов")
-                        
-                elif ctype == "text/plain":
+                if ctype == "text/plain":
                     text = payload.decode(charset, errors="replace")
-                    all_text += text
+                    text_parts.append(text)
                     print(f"\n📝 Текст письма:\n{text[:500]}...")
                     
                 elif ctype == "text/html":
                     text = parse_html(payload.decode(charset, errors="replace"))
-                    all_text += text
+                    text_parts.append(text)
                     
             except Exception as e:
                 print(f"   ⚠️ Ошибка: {e}")
         
-        # Extract data
+        # Extract data (one join instead of repeated string concatenation)
+        all_text = "\n".join(text_parts)
         phone = extract_phone(all_text)
         order = extract_order_number(all_text)
         
@@ -92,4 +125,4 @@ for sender in FROM_FILTERS:
         print(f"   🔢 Заказ: {order or '❌ не найден'}")
         print(f"{'='*50}")
 
-mail.logout()
+close_imap(HOST, USER)
@@ -1,67 +1,90 @@
 """Test product extraction from real email."""
-import imaplib
-import email
-from email.header import decode_header
+from email import policy
+from email.parser import BytesFeedParser
 import sys
 sys.path.insert(0, 'src')
 
+from config import load_config
+from email_client import close_imap, get_imap
 from parsers import parse_html
 from extractors import extract_phone, extract_order_number, extract_products, extract_total, format_products_for_notification
 
-HOST = "imap.gmail.com"
-USER = "lovelykimura832@gmail.com"
-PASSWORD = "ztrv pndd qslg jtsh"
+# Credentials come from .env (EMAIL_HOST, EMAIL_USER, EMAIL_PASSWORD)
+config = load_config()
+HOST = config.email_host
+USER = config.email_user
+PASSWORD = config.email_password
 FROM_FILTERS = ["s1963@yandex.ru", "nsv11061992@gmail.com"]
+FETCH_BATCH = 100  # Messages per IMAP FETCH
 
-def decode_header_str(header):
-    if not header:
-        return ""
-    decoded = []
-    for part, enc in decode_header(header):
-        if isinstance(part, bytes):
-            decoded.append(part.decode(enc or "utf-8", errors="replace"))
-        else:
-            decoded.append(part)
-    return " ".join(decoded)
+def fetch_raw(mail, nums, batch_size=FETCH_BATCH):
+    """Yield raw messages, one FETCH per batch_size messages."""
+    for i in range(0, len(nums), batch_size):
+        _, msg_data = mail.fetch(b",".join(nums[i:i + batch_size]), "(RFC822)")
+        # Response alternates (envelope, raw) tuples and b')' separators
+        for item in msg_data:
+            if isinstance(item, tuple):
+                yield item[1]
 
 print("Connecting...")
-mail = imaplib.IMAP4_SSL(HOST)
-mail.login(USER, PASSWORD)
-mail.select("INBOX")
+mail = get_imap(HOST, USER, PASSWORD)
 
 for sender in FROM_FILTERS:
     _, messages = mail.search(None, f'(FROM "{sender}")')
-    for num in messages[0].split():
-        _, msg_data = mail.fetch(num, "(RFC822)")
-        raw = msg_data[0][1]
-        msg = email.message_from_bytes(raw)
+    for raw in fetch_raw(mail, messages[0].split()):
+        # policy.default decodes RFC 2047 headers to str while parsing
+        parser = BytesFeedParser(policy=policy.default)
+        parser.feed(raw)
+        msg = parser.close()
         
-        subj = decode_header_str(msg.get("Subject"))
+        subj = msg.get("Subject", "")
         
-        all_text = subj + "\n"
+        # Cheapest sources first: subject and text/plain; HTML parts are
+        # kept aside and parsed only if something is still missing
+        text_parts = [subj]
+        html_parts = []
         
         for part in msg.walk():
             ctype = part.get_content_type()
+            if ctype == "text/html":
+                html_parts.append(part)
+                continue
+            # Decode only body text; skip images and other attachments
+            if ctype != "text/plain":
+                continue
             try:
                 payload = part.get_payload(decode=True)
-                if not payload:
-                    continue
-                charset = part.get_content_charset() or "utf-8"
-                
-                if ctype == "text/html":
-                    all_text += parse_html(payload.decode(charset, errors="replace"))
-                elif ctype == "text/plain":
-                    all_text += payload.decode(charset, errors="replace")
+                if payload:
+                    charset = part.get_content_charset() or "utf-8"
+                    text_parts.append(payload.decode(charset, errors="replace"))
             except:
                 pass
         
-        print("="*60)
-        print("РЕЗУЛЬТАТ ПАРСИНГА:")
-        print("="*60)
+        # One join instead of repeated string concatenation
+        all_text = "\n".join(text_parts)
         
         phone = extract_phone(all_text)
         order = extract_order_number(all_text)
         products = extract_products(all_text)
+        
+        if html_parts and not (phone and order and products):
+            for part in html_parts:
+                try:
+                    payload = part.get_payload(decode=True)
+                    if payload:
+                        charset = part.get_content_charset() or "utf-8"
+                        text_parts.append(parse_html(payload.decode(charset, errors="replace")))
+                except:
+                    pass
+            all_text = "\n".join(text_parts)
+            phone = extract_phone(all_text)
+            order = extract_order_number(all_text)
+            products = extract_products(all_text)
+        
+        print("="*60)
+        print("РЕЗУЛЬТАТ ПАРСИНГА:")
+        print("="*60)
+        
         total_pharm, total_client = extract_total(all_text)
         
         print(f"📱 Телефон: {phone or '❌'}")
@@ -80,4 +103,4 @@ for sender in FROM_FILTERS:
         notification += format_products_for_notification(products, total_client)
         print(notification)
 
-mail.logout()
+close_imap(HOST, USER)
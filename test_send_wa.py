@@ -1,8 +1,15 @@
 """Send test WhatsApp message."""
+import sys
+sys.path.insert(0, 'src')
+
 import httpx
 
-INSTANCE_ID = "1103482032"
-TOKEN = "bba3e83f5ed44671819b38a7465ad33a6407b03b0a934f0682"
+from config import load_config
+
+# Green-API credentials come from .env (GREENAPI_INSTANCE_ID, GREENAPI_TOKEN)
+config = load_config()
+INSTANCE_ID = config.greenapi_instance_id
+TOKEN = config.greenapi_token
 PHONE = "79086810960"
 
 url = f"https://api.green-api.com/waInstance{INSTANCE_ID}/sendMessage/{TOKEN}"
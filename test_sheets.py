@@ -2,10 +2,12 @@
 import sys
 sys.path.insert(0, 'src')
 
+from config import load_config
 from database.sheets import get_client, get_sheet, add_order, OrderRow
 from datetime import datetime
 
-CREDENTIALS_PATH = "photo-gallery-484020-c9d57645a635.json"
+# Service-account key path from .env (GOOGLE_CREDENTIALS_PATH)
+CREDENTIALS_PATH = load_config().google_credentials_path
 
 print("Подключаюсь к Google Sheets...")
 
@@ -0,0 +1,162 @@
+"""Tests for Katren email parsing and UID polling in the email monitor."""
+
+from email.header import Header
+
+import pytest
+import src.email_monitor as email_monitor
+from src.email_monitor import EmailContent, EmailMonitor, parse_katren_email
+from src.parsers.html_parser import parse_html
+
+
+KATREN_HTML = """<html><body>
+<p>Телефон клиента: +79991234567</p>
+<table>
+<tr><th>Товар</th><th>Кол-во</th><th>Цена для аптеки</th><th>Сумма для аптеки</th><th>Цена для клиента</th><th>Сумма для клиента</th></tr>
+<tr><td>КАРВЕДИЛОЛ КАНОН таб. 25мг N30</td><td>2</td><td>120,50</td><td>241,00</td><td>133,50</td><td>267</td></tr>
+<tr><td>ИТОГО:</td><td></td><td></td><td>241,00</td><td></td><td>267</td></tr>
+</table>
+</body></html>"""
+
+# raw_body carries parse_html output: one "cell| cell" line per table row
+KATREN_TEXT = parse_html(KATREN_HTML)
+
+
+class TestKatrenTotal:
+    """Test cases for the customer total in Katren emails."""
+
+    def test_header_column_does_not_take_product_numbers(self):
+        """Test that a "Сумма для клиента" header cell falls through to the ИТОГО row."""
+        phone, products, total = parse_katren_email(KATREN_TEXT)
+        assert phone == "79991234567"
+        assert len(products) == 1
+        assert total == 267.0
+
+    def test_process_email_total(self):
+        """Test the total reported by EmailMonitor.process_email."""
+        monitor = EmailMonitor(host="imap.example.com", user="user", password="pass")
+        content = EmailContent(
+            subject="Заказ №12345678",
+            sender="shop@apteka.ru",
+            body_text="",
+            attachments_text="",
+            raw_body=KATREN_TEXT,
+        )
+        order = monitor.process_email(content)
+        assert order.order_number == "12345678"
+        assert order.total == 267.0
+
+    def test_total_right_after_keyword(self):
+        """Test "Сумма для клиента: N" summary line."""
+        text = KATREN_TEXT + "\nСумма для клиента: 1199,50"
+        assert parse_katren_email(text)[2] == 1199.5
+
+    def test_upper_case_phone_label(self):
+        """Test that a "ТЕЛЕФОН КЛИЕНТА:" label is not skipped by the pre-check."""
+        text = KATREN_TEXT.replace("Телефон клиента", "ТЕЛЕФОН КЛИЕНТА")
+        phone, products, total = parse_katren_email(text)
+        assert phone == "79991234567"
+        assert len(products) == 1
+        assert total == 267.0
+
+    def test_short_phone_only_body(self):
+        """Test a short body with just a lower-case phone label."""
+        assert parse_katren_email("телефон клиента: 89991234567")[0] == "79991234567"
+
+    def test_non_katren_text_skipped(self):
+        """Test text with no phone label and no table rows."""
+        assert parse_katren_email("Спасибо за заказ! " * 20) == (None, [], 0.0)
+
+
+def _raw_email(subject: str) -> bytes:
+    encoded = Header(subject, "utf-8").encode()
+    return f"Subject: {encoded}\r\nFrom: shop@apteka.ru\r\n\r\nOrder ready".encode()
+
+
+class _StubImap:
+    """IMAP connection stub answering UID SEARCH/FETCH/STORE from a dict."""
+
+    def __init__(self, uid_after_body: bool = False, uidvalidity: bytes = b"1"):
+        self.messages = {5: _raw_email("Заказ 1"), 7: _raw_email("Заказ 2")}
+        self.uid_after_body = uid_after_body
+        self.uidvalidity = uidvalidity
+        self.searches: list[str] = []
+        self.stored: list[bytes] = []
+        self.search_reply = None
+
+    def response(self, code):
+        # Like imaplib: the untagged value is consumed on read
+        value, self.uidvalidity = self.uidvalidity, None
+        return code, [value]
+
+    def uid(self, command, *args):
+        if command == "search":
+            criteria = args[1]
+            self.searches.append(criteria)
+            if self.search_reply is not None:
+                return self.search_reply
+            low = int(criteria.split("UID ")[1].split(":")[0]) if "UID " in criteria else 1
+            # N:* always includes the highest UID
+            found = [u for u in self.messages if u >= low] or [max(self.messages)]
+            return "OK", [b" ".join(str(u).encode() for u in sorted(found))]
+        if command == "fetch":
+            data = []
+            for seq, uid in enumerate(args[0].split(b","), 1):
+                raw = self.messages[int(uid)]
+                if self.uid_after_body:
+                    data += [(b"%d (BODY[] {%d}" % (seq, len(raw)), raw), b" UID %s)" % uid]
+                else:
+                    data += [(b"%d (UID %s BODY[] {%d}" % (seq, uid, len(raw)), raw), b")"]
+            return "OK", data
+        if command == "store":
+            self.stored.append(args[0])
+            return "OK", [None]
+        raise AssertionError(command)
+
+
+class TestUidPolling:
+    """Test cases for UID-based incremental fetching."""
+
+    @pytest.fixture
+    def connect(self, monkeypatch):
+        monkeypatch.setattr(email_monitor, "_last_uids", {})
+        monkeypatch.setattr(email_monitor, "_uid_validity", {})
+
+        def use(stub):
+            monkeypatch.setattr(email_monitor, "get_imap", lambda *args, **kwargs: stub)
+            return EmailMonitor(host="imap.example.com", user="user", password="pass", from_filter="apteka.ru")
+        return use
+
+    @pytest.mark.parametrize("uid_after_body", [False, True])
+    def test_fetch_marks_seen_and_records_uid(self, connect, uid_after_body):
+        """Test both FETCH item orders: UID before and after the body literal."""
+        stub = _StubImap(uid_after_body=uid_after_body)
+        emails = connect(stub).fetch_unread_emails()
+        assert [e.subject for e in emails] == ["Заказ 1", "Заказ 2"]
+        assert stub.stored == [b"5,7"]
+        assert email_monitor._last_uids == {("imap.example.com", "user", "INBOX", "apteka.ru"): (1, 7)}
+
+    def test_next_poll_fetches_only_new_uids(self, connect):
+        """Test that later polls search UID N:* and drop the stale highest UID."""
+        stub = _StubImap()
+        monitor = connect(stub)
+        monitor.fetch_unread_emails()
+        assert monitor.fetch_unread_emails() == []
+        assert stub.searches[-1].endswith(' UID 8:*)')
+
+        stub.messages[9] = _raw_email("Заказ 3")
+        assert [e.subject for e in monitor.fetch_unread_emails()] == ["Заказ 3"]
+
+    def test_uidvalidity_change_resets_mark(self, connect):
+        """Test that a new UIDVALIDITY falls back to the full search."""
+        stub = _StubImap()
+        monitor = connect(stub)
+        monitor.fetch_unread_emails()
+        stub.uidvalidity = b"2"  # Mailbox re-selected with new UIDs
+        assert len(monitor.fetch_unread_emails()) == 2
+        assert "UID" not in stub.searches[-1]
+
+    def test_search_no_reply(self, connect):
+        """Test that a NO reply to UID SEARCH yields no emails."""
+        stub = _StubImap()
+        stub.search_reply = ("NO", [b"[CANNOT] Search failed"])
+        assert connect(stub).fetch_unread_emails() == []
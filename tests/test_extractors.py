@@ -1,8 +1,9 @@
-"""Tests for phone and order extractors."""
+"""Tests for phone, order and product extractors."""
 
 import pytest
-from src.extractors.phone import extract_phone, extract_all_phones, normalize_phone
+from src.extractors.phone import digits_only, extract_phone, extract_all_phones, normalize_phone
 from src.extractors.order import extract_order_number, extract_all_order_numbers
+from src.extractors.products import extract_products, extract_total
 
 
 class TestPhoneExtraction:
@@ -38,6 +39,11 @@ class TestPhoneExtraction:
         text = "Звоните: 8 999 123 45 67"
         assert extract_phone(text) == "+79991234567"
     
+    def test_full_number_preferred_over_earlier_10_digits(self):
+        """Test that a +7 number wins over a 10-digit number that comes first."""
+        text = "Заказ 9123456789, тел +79991234567"
+        assert extract_phone(text) == "+79991234567"
+    
     def test_no_phone(self):
         """Test text without phone number."""
         text = "Заказ готов, приходите!"
@@ -51,13 +57,28 @@ class TestPhoneExtraction:
         """Test normalization of 11-digit number starting with 8."""
         assert normalize_phone("89991234567") == "+79991234567"
     
+    def test_digits_only(self):
+        """Test digit stripping for formatted phones and free text."""
+        assert digits_only("+7 (999) 123-45-67") == "79991234567"
+        assert digits_only("📞 Телефон: 8 999 123 45 67") == "89991234567"
+        assert digits_only("Олег") == ""
+    
     def test_extract_all_phones(self):
         """Test extraction of multiple phone numbers."""
         text = "Первый: +7 999 111-11-11, второй: 8(888)222-22-22"
         phones = extract_all_phones(text)
-        assert len(phones) == 2
-        assert "+79991111111" in phones
-        assert "+78882222222" in phones
+        assert phones == ["+79991111111", "+78882222222"]
+    
+    def test_extract_all_phones_deduplicates_in_order(self):
+        """Test that repeated numbers are reported once, in order of appearance."""
+        text = "8 (999) 111-11-11, 8(888)222-22-22, +79991111111"
+        assert extract_all_phones(text) == ["+79991111111", "+78882222222"]
+
+    def test_extract_all_phones_compact_formats(self):
+        """Test that compact and 10-digit numbers are found by extract_all_phones."""
+        text = "Основной 89991112233, запасной 9884445566"
+        phones = extract_all_phones(text)
+        assert sorted(phones) == ["+79884445566", "+79991112233"]
 
 
 class TestOrderExtraction:
@@ -112,6 +133,43 @@ class TestOrderExtraction:
         assert "22222222" in orders
 
 
+class TestProductExtraction:
+    """Test cases for product table and total extraction."""
+    
+    TABLE = (
+        "Товар| Производитель| Кол-во| Цена для аптеки| Сумма для аптеки| Цена для клиента| Сумма для клиента| ШК\n"
+        "---|---|---|---|---|---|---|---\n"
+        "КАРВЕДИЛОЛ КАНОН| Канонфарма| 2| 120,50| 241,00| 133,50| 267| 4601234567890\n"
+        "МЕТФОРМИН| Озон| 1| 140| 140| 152| 152\n"
+        "ИТОГО:| | | | 381,00| | 419|\n"
+    )
+    
+    def test_extract_products_from_table(self):
+        """Test parsing of product rows, skipping header, separator and ИТОГО."""
+        products = extract_products(self.TABLE)
+        assert [p.name for p in products] == ["КАРВЕДИЛОЛ КАНОН", "МЕТФОРМИН"]
+        assert products[0].quantity == 2
+        assert products[0].price_pharmacy == 120.5
+        assert products[0].price_client == 133.5
+        assert products[0].total_client == 267.0
+    
+    def test_extract_products_no_table(self):
+        """Test text without table rows."""
+        assert extract_products("Заказ готов, приходите!") == []
+    
+    def test_extract_total(self):
+        """Test ИТОГО row parsing."""
+        assert extract_total(self.TABLE) == (381.0, 419.0)
+    
+    def test_extract_total_title_case(self):
+        """Test 'Итого' spelling of the total row."""
+        assert extract_total("Итого:| | | | 381,00| | 419|") == (381.0, 419.0)
+    
+    def test_extract_total_missing(self):
+        """Test text without ИТОГО row."""
+        assert extract_total("Заказ готов") == (0.0, 0.0)
+
+
 class TestRealWorldExamples:
     """Test with real-world-like email content."""
     
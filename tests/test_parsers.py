@@ -73,3 +73,43 @@ class TestHtmlParser:
         assert "12345678" in result
         assert "123-45-67" in result or "1234567" in result
         assert "готов" in result
+    
+    def test_table_rows_for_product_extraction(self):
+        """Test that table rows keep the "cell| cell" format extract_products relies on."""
+        html = """
+        <table>
+            <tr><th>Товар</th><th>Производитель</th><th>Кол-во</th></tr>
+            <tr><td>КАРВЕДИЛОЛ  КАНОН</td><td>Канонфарма</td><td>2</td></tr>
+        </table>
+        <p>С уважением</p>
+        """
+        result = parse_html(html)
+        assert result.splitlines() == [
+            "Товар| Производитель| Кол-во",
+            "КАРВЕДИЛОЛ КАНОН| Канонфарма| 2",
+            "С уважением",
+        ]
+    
+    def test_xml_declaration(self):
+        """Test XHTML with an XML encoding declaration keeps table rows."""
+        html = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<html><body><table><tr><td>КАРВЕДИЛОЛ</td><td>2</td></tr></table></body></html>'
+        )
+        assert parse_html(html) == "КАРВЕДИЛОЛ| 2"
+    
+    def test_row_with_nested_table(self):
+        """Test that cells of a row wrapping a nested table stay separated."""
+        html = (
+            "<table><tr><td>Телефон клиента:</td><td>+79991234567</td>"
+            "<td><table><tr><td>x</td><td>y</td></tr></table></td></tr></table>"
+        )
+        assert parse_html(html).splitlines() == [
+            "Телефон клиента:| +79991234567|",
+            "x| y",
+        ]
+    
+    def test_br_inside_cell(self):
+        """Test that <br> inside a table cell separates words."""
+        html = "<table><tr><td>Бетаметазон<br>крем</td><td>1</td></tr></table>"
+        assert parse_html(html) == "Бетаметазон крем| 1"